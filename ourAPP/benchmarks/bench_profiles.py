@@ -0,0 +1,179 @@
+# benchmarks/bench_profiles.py
+
+"""
+Benchmark of the SQLite performance profiles of ourModules/db_profiles.py.
+
+A database is generated with ourDB/generate_db_records.py and every profile
+(plus plain SQLite defaults, as a baseline) is timed on three workloads:
+
+    bulk_load   : copy every generated row into an empty database,
+                  one executemany + commit per 1000 rows (what a CSV import does)
+    interactive : single-row UPDATE commits and primary-key lookups (what TableTab does)
+    analytics   : the aggregate queries of the Statistics window
+
+Usage (from the repository root):
+    python ourAPP/benchmarks/bench_profiles.py --scale 1000 --repeat 3
+"""
+
+import os
+import io
+import sys
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+from time import perf_counter
+from pathlib import Path
+from statistics import median
+from contextlib import redirect_stdout
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+app_dir    = os.path.dirname(script_dir)
+repo_dir   = os.path.dirname(app_dir)
+sys.path.insert(0, app_dir)                         # ourModules
+sys.path.insert(0, os.path.join(repo_dir, "ourDB")) # generate_db_records
+
+from ourModules.db_profiles import PERFORMANCE_PROFILES, apply_profile
+from generate_db_records import PublishingDatabaseManager
+
+# Parents before children, so that foreign keys are satisfied while copying
+TABLE_ORDER = [
+    "PARTNER", "CLIENT", "PRINTING_HOUSE", "GENRE", "PUBLICATION", "CONTRACT",
+    "client_orders", "order_printing_house", "contributes",
+    "communication-CLIENT", "communication-PARTNER", "communication-PRINTING",
+]
+
+ANALYTICS_QUERIES = [
+    # Money Earned
+    '''SELECT strftime('%Y', "order date") AS Year, SUM("payment")
+       FROM "client_orders" GROUP BY Year ORDER BY Year''',
+    # Book Sales
+    '''SELECT "PUBLICATION"."title", SUM("client_orders"."quantity") AS Total_Sales
+       FROM "client_orders" JOIN "PUBLICATION" ON "client_orders"."Publication-isbn" = "PUBLICATION"."isbn"
+       GROUP BY "PUBLICATION"."title" ORDER BY Total_Sales DESC''',
+    # Author Sales
+    '''SELECT "PARTNER"."name", SUM("client_orders"."quantity") AS Total_Sales
+       FROM ("PARTNER" JOIN "contributes" ON "contributes"."Partner_TaxId" = "PARTNER"."Tax_Id")
+            JOIN "client_orders" ON "client_orders"."Publication-isbn" = "contributes"."Publication-isbn"
+       WHERE "PARTNER"."specialisation" = 2
+       GROUP BY "PARTNER"."Tax_Id" ORDER BY Total_Sales DESC''',
+    # Full scan sorted on a non-indexed column (what an unindexed table view sort costs)
+    '''SELECT * FROM "client_orders" ORDER BY "payment" DESC''',
+]
+
+BASELINE = "(sqlite defaults)"
+
+def connect(path, profile):
+    conn = sqlite3.connect(path, isolation_level=None)
+    if profile != BASELINE:
+        apply_profile(conn, profile)
+    conn.execute("PRAGMA foreign_keys = ON")
+
+    return conn;
+
+def generate_reference_db(path, scale_factor):
+    """Build the reference database with the project's own generator (quietly)."""
+    generator = PublishingDatabaseManager(scale_factor=scale_factor)
+    generator.db_path = path
+    with redirect_stdout(io.StringIO()):
+        generator.run()
+
+    return;
+
+def bench_bulk_load(ref_path, work_dir, profile, schema_sql, chunk=1000):
+    path = os.path.join(work_dir, "bulk.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    source = sqlite3.connect(ref_path)
+    data = {table: source.execute(f'SELECT * FROM "{table}"').fetchall() for table in TABLE_ORDER}
+    source.close()
+
+    conn = connect(path, profile)
+    conn.executescript(schema_sql)
+
+    start = perf_counter() # Only the inserts are timed
+    for table in TABLE_ORDER:
+        rows = data[table]
+        if not rows:
+            continue
+        placeholders = ", ".join("?" for _ in rows[0])
+        query = f'INSERT INTO "{table}" VALUES ({placeholders})'
+        for i in range(0, len(rows), chunk):
+            conn.execute("BEGIN")
+            conn.executemany(query, rows[i:i + chunk])
+            conn.execute("COMMIT")
+    elapsed = perf_counter() - start
+
+    conn.close()
+
+    return elapsed;
+
+def bench_interactive(ref_path, work_dir, profile, n_ops=300):
+    path = os.path.join(work_dir, "interactive.db")
+    shutil.copyfile(ref_path, path)
+
+    conn = connect(path, profile)
+    isbns = [r[0] for r in conn.execute('SELECT "isbn" FROM "PUBLICATION"')]
+    max_order = conn.execute('SELECT MAX("order_id") FROM "client_orders"').fetchone()[0]
+    rng = random.Random(42)
+
+    start = perf_counter()
+    for _ in range(n_ops):
+        conn.execute('UPDATE "PUBLICATION" SET "stock" = "stock" + 1 WHERE "isbn" = ?', (rng.choice(isbns),))
+        conn.execute('SELECT * FROM "client_orders" WHERE "order_id" = ?', (rng.randint(1, max_order),)).fetchall()
+    elapsed = perf_counter() - start
+
+    conn.close()
+
+    return elapsed;
+
+def bench_analytics(ref_path, profile):
+    uri = Path(ref_path).absolute().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, isolation_level=None)
+    if profile != BASELINE:
+        apply_profile(conn, profile, read_only=True)
+
+    for query in ANALYTICS_QUERIES: # Warm-up: pooled read-only connections are reused
+        conn.execute(query).fetchall()
+
+    start = perf_counter()
+    for query in ANALYTICS_QUERIES:
+        conn.execute(query).fetchall()
+    elapsed = perf_counter() - start
+
+    conn.close()
+
+    return elapsed;
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=1000, help="scale_factor of the generated database")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (the median is reported)")
+    args = parser.parse_args()
+
+    with open(os.path.join(repo_dir, "ourDB", "schema.sql"), "r", encoding="utf-8") as f:
+        schema_sql = f.read()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        ref_path = os.path.join(work_dir, "reference.db")
+        print(f"Generating reference database (scale factor {args.scale})...")
+        generate_reference_db(ref_path, args.scale)
+        n_orders = sqlite3.connect(ref_path).execute('SELECT COUNT(*) FROM "client_orders"').fetchone()[0]
+        print(f"{n_orders} client orders.\n")
+
+        profiles = [BASELINE] + list(PERFORMANCE_PROFILES)
+        print(f"{'profile':<22} | {'bulk_load':>10} | {'interactive':>11} | {'analytics':>10}")
+        print("-" * 62)
+        for profile in profiles:
+            bulk = median(bench_bulk_load(ref_path, work_dir, profile, schema_sql) for _ in range(args.repeat))
+            inter = median(bench_interactive(ref_path, work_dir, profile) for _ in range(args.repeat))
+            analytics = median(bench_analytics(ref_path, profile) for _ in range(args.repeat))
+            print(f"{profile:<22} | {bulk:>9.3f}s | {inter:>10.3f}s | {analytics:>9.3f}s")
+
+    return;
+
+if __name__ == "__main__":
+    main()
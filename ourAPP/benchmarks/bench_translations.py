@@ -0,0 +1,92 @@
+# benchmarks/bench_translations.py
+
+"""
+Micro-benchmark of the raw -> display value translation of ourModules/translations.py.
+
+A page of PARTNER-like rows (name, Tax_Id, specialisation, comments) and of
+client_orders-like rows (7 columns, nothing to translate) is converted three ways:
+
+    per_cell  : to_display_value(col_name, value) for every cell (the old way)
+    per_col   : the tuple of compile_display_converters(), one call per cell
+    row_fn    : compile_row_to_display(), one call per row
+
+Usage (from the repository root):
+    python ourAPP/benchmarks/bench_translations.py --rows 1000000 --repeat 3
+"""
+
+import os
+import gc
+import sys
+import random
+import argparse
+from time import perf_counter
+from statistics import median
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+app_dir    = os.path.dirname(script_dir)
+sys.path.insert(0, app_dir) # ourModules
+
+from ourModules.translations import to_display_value, compile_display_converters, compile_row_to_display
+
+PARTNER_COLS = ["name", "Tax_Id", "specialisation", "comments"]
+ORDER_COLS   = ["order_id", "Client_Tax_ID", "Publication-isbn", "quantity", "order date", "delivery date", "payment"]
+
+def make_rows(col_names, n_rows, seed=42):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        row = []
+        for col in col_names:
+            if col == "specialisation":
+                row.append(rng.randint(1, 4))
+            elif col == "comments":
+                row.append(rng.choice([None, 1, 2, 3, 4, 5]))
+            else:
+                row.append(rng.choice([i, f"value {i}", 12.5, None]))
+        rows.append(tuple(row))
+
+    return rows;
+
+def per_cell(col_names, rows):
+    return [[to_display_value(col_name, raw_val) for col_name, raw_val in zip(col_names, row)] for row in rows];
+
+def per_col(col_names, rows):
+    converters = compile_display_converters(col_names)
+    return [[convert(raw_val) for convert, raw_val in zip(converters, row)] for row in rows];
+
+def row_fn(col_names, rows):
+    row_to_display = compile_row_to_display(col_names)
+    return [row_to_display(row) for row in rows];
+
+def timed(function, col_names, rows):
+    gc.collect()
+    gc.disable() # Like timeit: measure the conversion, not the collector walking a million new lists
+    try:
+        start = perf_counter()
+        function(col_names, rows)
+        return perf_counter() - start;
+    finally:
+        gc.enable()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (the median is reported)")
+    args = parser.parse_args()
+
+    print(f"{'table':<15} | {'per_cell':>9} | {'per_col':>9} | {'row_fn':>9} | {'speed-up':>8}")
+    print("-" * 62)
+    for (table, col_names) in (("PARTNER", PARTNER_COLS), ("client_orders", ORDER_COLS)):
+        rows = make_rows(col_names, args.rows)
+        assert per_cell(col_names, rows[:1000]) == row_fn(col_names, rows[:1000]) # Same result
+
+        times = [median(timed(f, col_names, rows) for _ in range(args.repeat)) for f in (per_cell, per_col, row_fn)]
+        print(
+            f"{table:<15} | {times[0]:>8.3f}s | {times[1]:>8.3f}s | {times[2]:>8.3f}s | "
+            f"{times[0] / times[2]:>7.1f}x"
+        )
+
+    return;
+
+if __name__ == "__main__":
+    main()
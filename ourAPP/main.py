@@ -1,20 +1,29 @@
 # main.py
 
 import os
+import argparse
 from sys import exit
 import tkinter as tk
 from tkinter import ttk, messagebox
 
 from ourModules.database_manager import DatabaseManager
+from ourModules.query_executor import QueryExecutor
+from ourModules.db_profiles import READ_WRITE_PROFILES, DEFAULT_PROFILE
+from ourModules.query_stats import QueryStats
+from ourModules.query_stats_window import QueryStatsWindow
 from ourModules.table_tab import TableTab
 from ourModules.search_window import SearchWindow
+from ourModules.result_cache import ResultCache
 from ourModules.stats_window import StatsWindow
 
 from ourModules.translations import table_to_display
 from ourModules.animated_window import AnimatedWindow
 
 class PublishingHouseApp(tk.Tk):
-    def __init__(self, db_path):
+    EXTERNAL_POLL_MS = 2000 # How often to check whether another process changed the database
+    PREFETCH_DELAY_MS = 500 # Idle time after a tab is opened before the next tab is prefetched
+
+    def __init__(self, db_path, profile=DEFAULT_PROFILE, slow_query_ms=200, prefetch_tabs=True):
         super().__init__()
         
         self.title("Publishing House DB - GUI")
@@ -39,7 +48,13 @@ class PublishingHouseApp(tk.Tk):
         #style.configure("Custom.TLabelFrame.Label", background="#d9e8f5", foreground="#333", font=("Arial", 10, "bold"))
 
         # Database
-        self.db_manager = DatabaseManager(db_path)
+        self.query_stats = QueryStats( # Latency of every statement + slow-query log next to the DB
+            slow_threshold_ms=slow_query_ms,
+            log_path=os.path.join(os.path.dirname(os.path.abspath(db_path)), "slow_queries.log")
+        )
+        self.db_manager = DatabaseManager(db_path, profile=profile, query_stats=self.query_stats)
+        self.query_executor = QueryExecutor(self, self.db_manager) # Runs SQL off the Tk thread
+        self.result_cache = ResultCache() # Search results, shared by every SearchWindow
         
         # Top button frame
         self.top_button_frame = ttk.Frame(self, padding=10)
@@ -51,6 +66,9 @@ class PublishingHouseApp(tk.Tk):
         
         self.stats_button = ttk.Button(self.top_button_frame, text="Statistics", command=self.open_stats_window)
         self.stats_button.pack(side="left", padx=5)
+
+        self.query_stats_button = ttk.Button(self.top_button_frame, text="Query Stats", command=self.open_query_stats_window)
+        self.query_stats_button.pack(side="left", padx=5)
         
         # Notebook. Η λειτουργία του notebook είναι να μπορεί να έχει πολλά tabs
         self.notebook = ttk.Notebook(self)
@@ -59,30 +77,115 @@ class PublishingHouseApp(tk.Tk):
         # Create a "Home" tab
         self.create_home_tab()
         
-        # Create a tab for each table in the DB
-        self.table_frames = {} # Store the TableTab instances
+        # Create a tab for each table in the DB. Each tab starts as an empty placeholder
+        # frame; its TableTab is built (and its first page read) when it is first opened.
+        self.table_frames = {}     # Store the TableTab instances, see get_table_tab
+        self.tab_placeholders = {} # table -> placeholder frame (the actual notebook page)
+        self.prefetch_tabs = prefetch_tabs
+        self.prefetch_job = None
         table_list = self.db_manager.get_table_list() # Get the list of tables from the DB
         for table in table_list:
-            display_name = table_to_display(table)
-            frame = TableTab(
-                parent_notebook = self.notebook,
+            placeholder = ttk.Frame(self.notebook)
+            self.tab_placeholders[table] = placeholder
+            self.notebook.add(placeholder, text=table_to_display(table))
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+        # Writes of other processes (PRAGMA data_version)
+        self.db_manager.poll_external_changes() # Baseline
+        self.poll_job = self.after(self.EXTERNAL_POLL_MS, self.poll_external_changes)
+
+        # Clean up on close
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        return;
+
+    def get_table_tab(self, table_name):
+        """The TableTab of `table_name`, built inside its placeholder on first use."""
+        tab = self.table_frames.get(table_name)
+        if tab is None:
+            tab = TableTab(
+                parent_notebook = self.tab_placeholders[table_name],
                 db_manager = self.db_manager,
-                table_name = table,
+                query_executor = self.query_executor,
+                table_name = table_name,
                 main_app = self,
-                display_name = display_name
+                display_name = table_to_display(table_name)
             )
-            self.table_frames[table] = frame
-            self.notebook.add(frame, text=display_name)
+            tab.pack(expand=True, fill='both')
+            self.table_frames[table_name] = tab
 
-        # Clean up on close
-        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        return tab;
+
+    def current_table(self):
+        """Table of the selected notebook tab (None for the Home tab)."""
+        selected = self.notebook.select()
+        for table, placeholder in self.tab_placeholders.items():
+            if str(placeholder) == selected:
+                return table;
+
+        return None;
+
+    def on_tab_changed(self, event):
+        """<<NotebookTabChanged>>: build / refresh the opened tab, then prefetch the next one."""
+        table = self.current_table()
+        if table is None:
+            return;
+
+        if table in self.table_frames:
+            self.refresh_current_tab()
+        else:
+            self.get_table_tab(table) # Loads its first page in the background
+
+        if self.prefetch_tabs:
+            if self.prefetch_job is not None:
+                self.after_cancel(self.prefetch_job)
+            self.prefetch_job = self.after(self.PREFETCH_DELAY_MS, lambda: self.prefetch_next_tab(table))
 
         return;
 
-    def refresh_all_tabs(self):
-        """Refresh the TreeView in all TableTab instances."""
-        for tab in self.table_frames.values():
-            tab.populate_treeview()
+    def prefetch_next_tab(self, table):
+        """Build the tab to the right of `table` (the one users usually open next), if not built yet."""
+        self.prefetch_job = None
+        tables = list(self.tab_placeholders)
+        position = tables.index(table)
+        if position + 1 < len(tables):
+            self.get_table_tab(tables[position + 1])
+
+        return;
+
+    def on_table_written(self, table_name, operation, in_place=False):
+        """
+        After an insert / update / delete on `table_name`: mark the tables the write
+        can have changed (the table itself + ON DELETE/UPDATE CASCADE or SET NULL
+        children, see DatabaseManager.affected_tables) and reload the visible one.
+        The other affected tabs reload when they are opened, the rest never do.
+        `in_place`: the tab of `table_name` already applied the row itself
+        (TableTab.apply_row_delta), so it stays as it is, unless another connection
+        committed meanwhile (mark_changed then bumps every table).
+        """
+        external = self.db_manager.poll_external_changes() # Commits of others since the last poll: every tab is stale
+        tables = self.db_manager.affected_tables(table_name, operation)
+        self.db_manager.mark_changed(tables)
+        if in_place and not external:
+            tab = self.get_table_tab(table_name)
+            tab.loaded_version = self.db_manager.table_version(table_name)
+        self.refresh_current_tab()
+
+        return;
+
+    def refresh_current_tab(self):
+        """Reload the selected tab, if its table changed since it was loaded."""
+        current = self.table_frames.get(self.current_table())
+        if current is not None and current.is_stale():
+            current.populate_treeview(keep_position=True)
+
+        return;
+
+    def poll_external_changes(self):
+        """Every EXTERNAL_POLL_MS: if another connection committed, every tab is stale."""
+        if self.db_manager.poll_external_changes():
+            self.refresh_current_tab()
+        self.poll_job = self.after(self.EXTERNAL_POLL_MS, self.poll_external_changes)
 
         return;
 
@@ -145,7 +248,7 @@ class PublishingHouseApp(tk.Tk):
         return;
 
     def open_search_window(self):
-        temp = SearchWindow(self, self.db_manager)
+        temp = SearchWindow(self, self.db_manager, self.query_executor, self.result_cache)
         animator = AnimatedWindow(temp, start_size=(100, 100), final_size=(1280, 800), duration=400)
         temp.protocol("WM_DELETE_WINDOW", animator.close_animation)
         animator.open_animation()
@@ -153,42 +256,77 @@ class PublishingHouseApp(tk.Tk):
         return;
 
     def open_stats_window(self):
-        temp = StatsWindow(self, self.db_manager)
+        temp = StatsWindow(self, self.db_manager, self.query_executor)
         animator = AnimatedWindow(temp, start_size=(100, 100), final_size=(1280, 800), duration=400)
         temp.protocol("WM_DELETE_WINDOW", animator.close_animation)
         animator.open_animation()
 
         return;
 
+    def open_query_stats_window(self):
+        temp = QueryStatsWindow(self, self.query_stats)
+        animator = AnimatedWindow(temp, start_size=(100, 100), final_size=(1280, 600), duration=400)
+        temp.protocol("WM_DELETE_WINDOW", animator.close_animation)
+        animator.open_animation()
+
+        return;
+
     def on_closing(self):
         """Prompt user, then close connection and destroy window if confirmed."""
         if messagebox.askokcancel("Quit", "Do you really want to quit?"):
+            self.after_cancel(self.poll_job)
+            if self.prefetch_job is not None:
+                self.after_cancel(self.prefetch_job)
+            self.query_executor.shutdown()
             self.db_manager.close_connection()
             exit();
 
         return;
 
-    def select_row_in_table(self, table_name, row_data): #
-        # table_name should exactly match a key in self.table_frames
-        if table_name not in self.table_frames:
-            messagebox.showerror("Error", f"Table '{table_name}' not found in table_frames!")
+    def select_row_in_table(self, table_name, key): # key: primary key tuple of the row
+        # table_name should exactly match a key in self.tab_placeholders
+        if table_name not in self.tab_placeholders:
+            messagebox.showerror("Error", f"Table '{table_name}' not found in tab_placeholders!")
             return
 
-        # Switch to that table's tab by finding the index of the tab
-        keys_list = list(self.table_frames.keys())
-        index = keys_list.index(table_name)
-        self.notebook.select(index + 1) # +1 because the first tab is the "Home" tab!
+        # Switch to that table's tab
+        self.notebook.select(self.tab_placeholders[table_name])
 
-        # Then fill in the data
-        frame = self.table_frames[table_name]
-        frame.select_row_data(row_data) # Call the method in TableTab
+        # Then select the row (loading its page if needed) and fill in the data
+        frame = self.get_table_tab(table_name)
+        frame.select_row_data(key) # Call the method in TableTab
 
         return;
 
 def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     new_path   = os.path.dirname(script_dir)
-    app = PublishingHouseApp(db_path=os.path.join(new_path, "publishing_house.db"))
+
+    # Command line (or environment) configuration
+    parser = argparse.ArgumentParser(description="Publishing House DB - GUI")
+    parser.add_argument(
+        "--db", default=os.path.join(new_path, "publishing_house.db"),
+        help="Path of the SQLite database file"
+    )
+    parser.add_argument(
+        "--profile", choices=READ_WRITE_PROFILES,
+        default=os.environ.get("PUBLISHING_HOUSE_PROFILE", DEFAULT_PROFILE),
+        help="SQLite performance profile of the read-write connections "
+             "(also settable with the PUBLISHING_HOUSE_PROFILE environment variable)"
+    )
+    parser.add_argument(
+        "--no-prefetch", action="store_true",
+        help="Do not build the next tab in the background after a tab is opened"
+    )
+    parser.add_argument(
+        "--slow-ms", type=float, default=200,
+        help="Statements slower than this (milliseconds) go to slow_queries.log with their query plan"
+    )
+    args = parser.parse_args()
+
+    app = PublishingHouseApp(
+        db_path=args.db, profile=args.profile, slow_query_ms=args.slow_ms, prefetch_tabs=not args.no_prefetch
+    )
     app.mainloop()
 
     return;
@@ -0,0 +1,169 @@
+# ourModules/csv_importer.py
+
+import os
+import re
+import csv
+
+from ourModules.translations import compile_from_display_converters
+
+def normalize_header(name: str) -> str:
+    """'Order Date', 'order_date' and 'ORDER-DATE' all become 'orderdate'."""
+    return re.sub(r"[\s_\-]+", "", name.strip().casefold());
+
+class CsvImporter:
+    """
+    Streams a CSV file into one table.
+
+    The header row is matched to the table's columns (ignoring case, spaces, "_"
+    and "-"), display values are converted back to raw ones (from_display_value)
+    and the rows are inserted `chunk_size` at a time: one executemany and one
+    commit per chunk, under the "bulk_load" performance profile. Only one chunk
+    is in memory at a time.
+
+    Rows that violate a CHECK / FOREIGN KEY / UNIQUE constraint (or have the wrong
+    number of fields) do not stop the import: they go to a rejects CSV with their
+    original fields, line number and error message.
+    """
+    def __init__(self, db_manager, table_name, chunk_size=5000, profile="bulk_load"):
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.chunk_size = chunk_size
+        self.profile = profile
+
+        # PRAGMA table_info -> (cid, name, type, notnull, dflt_value, pk)
+        self.col_names = [col[1] for col in self.db_manager.get_table_columns(table_name)]
+
+        return;
+
+    def map_headers(self, headers):
+        """
+        Column name for every CSV header (None = unknown header, that field is skipped).
+        Raises ValueError if no header matches or two headers map to the same column.
+        """
+        by_normalized = {normalize_header(col): col for col in self.col_names}
+        mapping = [by_normalized.get(normalize_header(header)) for header in headers]
+
+        matched = [col for col in mapping if col is not None]
+        if not matched:
+            raise ValueError(
+                f"None of the CSV headers {headers} matches a column of {self.table_name} "
+                f"({', '.join(self.col_names)})"
+            )
+        if len(matched) != len(set(matched)):
+            raise ValueError(f"Several CSV headers map to the same column: {headers}")
+
+        return mapping;
+
+    @staticmethod
+    def default_rejects_path(csv_path):
+        (root, _) = os.path.splitext(csv_path)
+
+        return f"{root}.rejects.csv";
+
+    def run(self, csv_path, rejects_path=None, conn=None, cancel_event=None, progress=None):
+        """
+        Import `csv_path` (UTF-8, first row = headers).
+
+        :param conn:         connection to write with (the calling thread's one by default)
+        :param cancel_event: threading.Event checked between chunks; committed chunks stay
+        :param progress:     progress(rows_done, fraction of the file read) after every chunk
+        :return: dict with inserted, rejected, rejects_path (None if nothing was rejected), cancelled
+        """
+        rejects_path = rejects_path or self.default_rejects_path(csv_path)
+        summary = {"inserted": 0, "rejected": 0, "rejects_path": None, "cancelled": False}
+        rejects_file = None
+        rejects_writer = None
+
+        def reject(line, fields, error):
+            nonlocal rejects_file, rejects_writer
+            if rejects_writer is None: # Only created when there is something to reject
+                rejects_file = open(rejects_path, "w", newline="", encoding="utf-8")
+                rejects_writer = csv.writer(rejects_file)
+                rejects_writer.writerow(headers + ["line", "error"])
+                summary["rejects_path"] = rejects_path
+            rejects_writer.writerow(list(fields) + [line, error])
+            summary["rejected"] += 1
+
+            return;
+
+        with open(csv_path, "r", newline="", encoding="utf-8-sig") as f:
+            file_size = os.fstat(f.fileno()).st_size or 1
+            reader = csv.reader(f)
+            headers = next(reader, None)
+            if headers is None:
+                return summary; # Empty file
+
+            mapping = self.map_headers(headers)
+            used = [(i, col) for i, col in enumerate(mapping) if col is not None]
+            # (field index, from-display converter) of every imported field, e.g. "Writer" -> 2
+            converters = list(zip(
+                (i for (i, _) in used), compile_from_display_converters([col for (_, col) in used])
+            ))
+            columns = ", ".join(f'"{col}"' for (_, col) in used)
+            placeholders = ", ".join("?" for _ in used)
+            query = f'INSERT INTO "{self.table_name}" ({columns}) VALUES ({placeholders})'
+
+            def insert_chunk(chunk):
+                (inserted, failures) = self.db_manager.executemany_each(query, [params for (_, _, params) in chunk], conn=conn)
+                summary["inserted"] += inserted
+                for (index, _, error) in failures:
+                    (line, fields, _) = chunk[index]
+                    reject(line, fields, error)
+                if progress is not None:
+                    progress(summary["inserted"] + summary["rejected"], f.buffer.tell() / file_size)
+
+                return;
+
+            try:
+                with self.db_manager.use_profile(self.profile, conn) as conn:
+                    chunk = []
+                    for fields in reader:
+                        if not fields:
+                            continue # Blank line
+                        if len(fields) != len(headers):
+                            reject(reader.line_num, fields, f"expected {len(headers)} fields, got {len(fields)}")
+                            continue
+
+                        params = tuple(
+                            None if value == "" else value
+                            for value in (convert(fields[i]) for (i, convert) in converters)
+                        )
+                        chunk.append((reader.line_num, fields, params))
+
+                        if len(chunk) >= self.chunk_size:
+                            insert_chunk(chunk)
+                            chunk = []
+                            if cancel_event is not None and cancel_event.is_set():
+                                summary["cancelled"] = True
+                                break
+                    else:
+                        if chunk:
+                            insert_chunk(chunk)
+            finally:
+                if rejects_file is not None:
+                    rejects_file.close()
+
+        return summary;
+
+def main():
+    """Command line import, run from ourAPP/: python -m ourModules.csv_importer DB TABLE CSV"""
+    import argparse
+    from ourModules.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Import a CSV file into a table of the publishing house database")
+    parser.add_argument("db", help="Path of the SQLite database file")
+    parser.add_argument("table", help="Table name, e.g. client_orders")
+    parser.add_argument("csv", help="CSV file, first row = column names")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db)
+    importer = CsvImporter(db_manager, args.table, chunk_size=args.chunk_size)
+    summary = importer.run(args.csv, progress=lambda rows, fraction: print(f"\r{rows} rows ({fraction:.0%})", end=""))
+    print(f"\n{summary}")
+    db_manager.close_connection()
+
+    return;
+
+if __name__ == "__main__":
+    main()
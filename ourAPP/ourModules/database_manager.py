@@ -1,66 +1,742 @@
 # ourModules/database_manager.py
 
 import sqlite3
+import threading
+import queue
+from time import perf_counter
+from pathlib import Path
+from contextlib import contextmanager
+
+from ourModules.db_profiles import apply_profile, get_profile, DEFAULT_PROFILE, DEFAULT_READ_ONLY_PROFILE, READ_WRITE_PROFILES
+from ourModules.query_stats import Stopwatch
+from ourModules.translations import lookup_view_statements
+
+FULLTEXT_SUFFIX = "_fts" # "<table>_fts" is the FTS5 index of a table's text columns
+
+# Foreign key actions that make SQLite change the referencing rows as well
+_PROPAGATING_ACTIONS = {"CASCADE", "SET NULL", "SET DEFAULT"}
 
 class DatabaseManager:
-    def __init__(self, db_path="publishing_house.db"):
+    """
+    Owns every SQLite connection of the application.
+
+    The Tk (main) thread keeps its own connection in `self.conn`. Any other thread
+    gets a connection from a small pool, either explicitly with `connection()` /
+    `acquire()` + `release()`, or implicitly (one per thread) through `execute()`
+    and `fetchall()`. All connections are opened in WAL mode, so readers never
+    wait on an in-flight write.
+
+    Analytics and search read through a second pool of `mode=ro` connections
+    (`acquire(read_only=True)` / `snapshot()`), which can never take a write lock.
+
+    Journal mode, synchronous, cache and mmap sizes come from a named performance
+    profile (see ourModules/db_profiles.py): `profile` for read-write connections,
+    `read_only_profile` for the read-only ones. `profile` must be one of
+    READ_WRITE_PROFILES, the ones that switch the file to WAL.
+
+    Every statement that goes through the manager is timed and handed to
+    `query_stats` (an ourModules.query_stats.QueryStats), if one is set, also
+    when it fails; see QueryStats for what is not recorded.
+    """
+    def __init__(self, db_path="publishing_house.db", pool_size=4, busy_timeout=5000,
+                 profile=DEFAULT_PROFILE, read_only_profile=DEFAULT_READ_ONLY_PROFILE,
+                 read_only_mmap_size=None, immutable=False, query_stats=None):
         self.db_path = db_path
-        self.conn = None
-        self.cursor = None
+        self.pool_size = pool_size       # Max number of pooled (non-main-thread) connections, per pool
+        self.busy_timeout = busy_timeout # Milliseconds to wait on a locked database before failing
+        self.profile = profile           # Performance profile of read-write connections
+        self.read_only_profile = read_only_profile
+        self.read_only_mmap_size = read_only_mmap_size # Overrides the profile's mmap_size for read-only connections
+        self.immutable = immutable       # Only for a database file nobody writes to (e.g. an archived copy)
+        self.query_stats = query_stats   # Latency histogram + slow-query log (None = not collected)
+
+        get_profile(self.profile) # Fail early on a misspelled profile name
+        get_profile(self.read_only_profile)
+        if self.profile not in READ_WRITE_PROFILES:
+            raise ValueError(
+                f"Profile '{self.profile}' does not put the database in WAL mode and cannot be used "
+                f"for the read-write connections. Choose one of: {', '.join(READ_WRITE_PROFILES)}"
+            )
+        self.conn = None                 # Connection of the thread that created the manager (Tk thread)
+
+        self._owner_thread = threading.get_ident()
+        self._pool = queue.LifoQueue()   # Idle pooled read-write connections
+        self._pooled = []                # Every pooled read-write connection ever opened (idle or checked out)
+        self._ro_pool = queue.LifoQueue()# Same for the read-only connections
+        self._ro_pooled = []
+        self._ro_ids = set()             # id() of every read-only connection
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()  # Per-thread checked out connection (see get_connection)
+        self._tx_depth = {}              # id(connection) -> nesting depth of transaction() blocks
+        self._schema_cache = None        # See _schema(), keyed on PRAGMA schema_version
+        self._schema_lock = threading.Lock()
+        self._table_versions = {}        # table -> change counter, see mark_changed()
+        self._data_version = None        # Last PRAGMA data_version seen by poll_external_changes()
+        self._versions_lock = threading.Lock()
+
         self.open_connection()
 
         return;
-    
+
+    def _connect(self):
+        """Open a new connection: performance profile, foreign keys and busy timeout."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout / 1000,
+            check_same_thread=False, # Pooled connections may be handed between threads
+            isolation_level=None     # Autocommit; transactions are opened explicitly by transaction()
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        apply_profile(conn, self.profile)
+        conn.execute("PRAGMA foreign_keys = ON")
+        self._create_lookup_views(conn)
+        conn.set_trace_callback(self._trace)
+
+        return conn;
+
+    def _connect_read_only(self):
+        """Open a `mode=ro` URI connection (optionally immutable / memory-mapped)."""
+        uri = Path(self.db_path).absolute().as_uri() + "?mode=ro"
+        if self.immutable:
+            uri += "&immutable=1" # No locking at all; SQLite trusts that the file never changes
+
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            timeout=self.busy_timeout / 1000,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        self._create_lookup_views(conn) # Before query_only, which also forbids TEMP objects
+        conn.execute("PRAGMA query_only = ON")
+        apply_profile(conn, self.read_only_profile, read_only=True)
+        if self.read_only_mmap_size is not None:
+            conn.execute(f"PRAGMA mmap_size = {int(self.read_only_mmap_size)}")
+        conn.set_trace_callback(self._trace)
+
+        return conn;
+
+    @staticmethod
+    def _create_lookup_views(conn):
+        """
+        TEMP views of the display mappings (translations.LOOKUP_VIEWS), e.g.
+        "specialisation_labels" ("id", "label"). They live in the connection's temp
+        schema only: nothing is written to the database file, even read-only ones work.
+        """
+        for statement in lookup_view_statements():
+            conn.execute(statement)
+
+        return;
+
     def open_connection(self):
         if not self.conn:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.execute("PRAGMA foreign_keys = ON")
-
-            self.cursor = self.conn.cursor()
+            self.conn = self._connect()
 
         return;
-    
+
     def close_connection(self):
+        """Close the main connection and every pooled connection."""
         if self.conn:
             self.conn.commit()
             self.conn.close()
             self.conn = None
-            self.cursor = None
+
+        with self._pool_lock:
+            for conn in self._pooled + self._ro_pooled:
+                try:
+                    conn.close()
+                except sqlite3.ProgrammingError:
+                    pass # Already closed
+            self._pooled = []
+            self._pool = queue.LifoQueue()
+            self._ro_pooled = []
+            self._ro_pool = queue.LifoQueue()
+            self._ro_ids = set()
 
         return;
+
     def ensure_connection(self):
         if not self.conn:
             self.open_connection()
 
-    def execute(self, query, params=None):
-        """Execute a single query with optional parameters."""
-        self.ensure_connection()
+    # ------------------- Connection pool -------------------
+    def acquire(self, timeout=None, read_only=False):
+        """
+        Check out a pooled connection (a `mode=ro` one if `read_only`). Opens a new
+        one while that pool is below `pool_size`, otherwise waits (up to `timeout`
+        seconds, by default the busy timeout) for one to be released, then raises
+        OperationalError instead of blocking forever.
+        """
+        if timeout is None:
+            timeout = self.busy_timeout / 1000
+        pool = self._ro_pool if read_only else self._pool
+        try:
+            return pool.get_nowait();
+        except queue.Empty:
+            pass
+
+        with self._pool_lock:
+            pooled = self._ro_pooled if read_only else self._pooled
+            if len(pooled) < self.pool_size:
+                if read_only:
+                    conn = self._connect_read_only()
+                    self._ro_ids.add(id(conn))
+                else:
+                    conn = self._connect()
+                pooled.append(conn)
+                return conn;
+
+        try:
+            return pool.get(timeout=timeout);
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"Connection pool exhausted ({self.pool_size} connections in use)"
+            ) from None
+
+    def release(self, conn):
+        """Return a connection obtained from `acquire()` to its pool."""
+        if conn.in_transaction:
+            conn.rollback() # Never hand out a connection with a half-done transaction
+        self._tx_depth.pop(id(conn), None)
+
+        if id(conn) in self._ro_ids:
+            self._ro_pool.put(conn)
+        else:
+            self._pool.put(conn)
+
+        return;
+
+    @contextmanager
+    def connection(self, timeout=None, read_only=False):
+        """Context manager: `with db.connection() as conn: ...` checks a connection out and back in."""
+        conn = self.acquire(timeout, read_only)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    @contextmanager
+    def snapshot(self, timeout=None):
+        """
+        Read-only connection holding one read transaction for the whole block,
+        so every query inside it sees the same consistent snapshot of the
+        database, even while other connections keep committing (WAL).
+        """
+        with self.connection(timeout, read_only=True) as conn:
+            conn.execute("BEGIN") # Deferred: the snapshot starts with the first read
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback() # Nothing to commit on a read-only connection
+
+    def get_connection(self):
+        """
+        Connection for the calling thread: the main connection on the Tk thread,
+        otherwise a pooled connection bound to the thread until
+        `release_thread_connection()` is called (the QueryExecutor does so after
+        every job, so a worker never keeps one between jobs).
+        """
+        if threading.get_ident() == self._owner_thread:
+            self.ensure_connection()
+            return self.conn;
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.acquire()
+            self._local.conn = conn
+
+        return conn;
+
+    def release_thread_connection(self):
+        """Give the calling thread's pooled connection back (no-op on the Tk thread)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            self.release(conn)
+
+        return;
+
+    @contextmanager
+    def use_profile(self, name, conn=None):
+        """
+        Temporarily switch a connection to another performance profile, e.g.
+
+            with db.use_profile("bulk_load"), db.transaction():
+                db.executemany(...)
+
+        The manager's own profile is restored afterwards.
+        """
+        conn = conn or self.get_connection()
+        apply_profile(conn, name)
+        try:
+            yield conn
+        finally:
+            apply_profile(conn, self.profile)
+
+    # ------------------- Transactions -------------------
+    @contextmanager
+    def transaction(self, conn=None):
+        """
+        Group several writes into one commit:
+
+            with db.transaction():
+                db.execute(...)
+                db.executemany(...)
+
+        The outermost block runs BEGIN IMMEDIATE ... COMMIT, nested blocks become
+        SAVEPOINTs, so an exception inside a nested block only undoes that block.
+        """
+        conn = conn or self.get_connection()
+        depth = self._tx_depth.get(id(conn), 0)
+        savepoint = f"sp_{depth}"
+
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE") # Take the write lock now, not halfway through
+        else:
+            conn.execute(f"SAVEPOINT {savepoint}")
+        self._tx_depth[id(conn)] = depth + 1
+
+        try:
+            yield conn
+        except BaseException:
+            if depth == 0:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            if depth == 0:
+                try:
+                    conn.commit()
+                except sqlite3.Error:
+                    conn.rollback()
+                    raise
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+        finally:
+            if depth == 0:
+                self._tx_depth.pop(id(conn), None)
+            else:
+                self._tx_depth[id(conn)] = depth
+
+    def in_transaction(self, conn=None):
+        """True while the calling thread's connection is inside a transaction() block."""
+        conn = conn or self.get_connection()
+
+        return self._tx_depth.get(id(conn), 0) > 0;
+
+    # ------------------- Instrumentation -------------------
+    def _trace(self, statement):
+        """sqlite3 trace callback: counts the statements SQLite really runs (triggers, executemany rows...)."""
+        self._local.traced = getattr(self._local, "traced", 0) + 1
+
+        return;
+
+    @contextmanager
+    def tag(self, label):
+        """
+        Label every statement of the calling thread inside the block, e.g.
+        `with db.tag("Chart: Money Earned"): ...`, so QueryStats can tell which
+        tab, window or chart is spending the time.
+        """
+        previous = getattr(self._local, "tag", None)
+        self._local.tag = label
+        try:
+            yield
+        finally:
+            self._local.tag = previous
+
+    def _start_timing(self):
+        self._local.traced = 0
+
+        return perf_counter();
+
+    @contextmanager
+    def _timed(self, conn, query, params=(), explain=True):
+        """
+        Time the statement run inside the block and record it, also when it raises
+        (with the error). The block sets result["rows"] and, for executemany,
+        result["n_params"]; yields that dict.
+        """
+        result = {"rows": 0, "n_params": len(params)}
+        error = None
+        start = self._start_timing()
+        try:
+            yield result
+        except sqlite3.Error as e:
+            error = e
+            raise
+        finally:
+            self._record(
+                conn, query, params, result["n_params"], result["rows"], perf_counter() - start,
+                explain=explain, error=error
+            )
+
+    def _record(self, conn, query, params, n_params, n_rows, elapsed, explain=True, error=None):
+        """Hand one finished (or failed) statement to QueryStats (with its plan if it was slow)."""
+        if self.query_stats is None:
+            return;
+
+        statements = max(getattr(self._local, "traced", 1), 1)
+        plan = None
+        if explain and self.query_stats.is_slow(elapsed):
+            try:
+                plan = [
+                    f"{row[3]}" for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)
+                ]
+            except sqlite3.Error:
+                plan = None # e.g. PRAGMAs cannot be explained
+
+        self.query_stats.record(
+            query, n_params, n_rows, elapsed,
+            tag=getattr(self._local, "tag", None), statements=statements, plan=plan, error=error
+        )
+
+        return;
+
+    # ------------------- Queries -------------------
+    def execute(self, query, params=None, conn=None):
+        """
+        Execute a single query with optional parameters and return the cursor.
+        Outside a transaction() block the statement commits on its own.
+        """
+        conn = conn or self.get_connection()
         if params is None:
             params = ()
-        self.cursor.execute(query, params)
-        self.conn.commit()
 
-        return;
-    
-    def fetchall(self, query, params=None):
+        with self._timed(conn, query, params) as result:
+            cursor = conn.execute(query, params)
+            result["rows"] = cursor.rowcount
+
+        return cursor;
+
+    def executemany(self, query, seq_of_params, conn=None):
+        """
+        Run the same statement for every parameter tuple in one transaction
+        (one commit in total). `seq_of_params` may be any iterable, e.g. a generator.
+        Returns the number of affected rows.
+        """
+        with self.transaction(conn) as conn, self._timed(conn, query, explain=False) as result:
+            def counted(seq):
+                for params in seq:
+                    result["n_params"] = len(params)
+                    yield params
+
+            cursor = conn.executemany(query, counted(seq_of_params))
+            result["rows"] = cursor.rowcount
+
+        return cursor.rowcount;
+
+    def executemany_each(self, query, seq_of_params, conn=None):
+        """
+        executemany() in one transaction that skips the rows violating a constraint
+        (e.g. a foreign key RESTRICT) instead of aborting all of them.
+        Returns (affected rows, failures) with failures = [(index, params, error message), ...],
+        `index` being the position of the row in `seq_of_params`.
+
+        The whole batch first runs as one executemany inside a SAVEPOINT; only if
+        that fails is it redone row by row, each row in its own SAVEPOINT.
+        """
+        seq_of_params = list(seq_of_params) # Needed twice if a row fails
+        failures = []
+        total = 0
+
+        with self.transaction(conn) as conn:
+            try:
+                with self.transaction(conn), self._timed(conn, query, explain=False) as result:
+                    result["n_params"] = len(seq_of_params[0]) if seq_of_params else 0
+                    cursor = conn.executemany(query, seq_of_params)
+                    result["rows"] = cursor.rowcount
+                return (max(cursor.rowcount, 0), failures);
+            except sqlite3.IntegrityError:
+                pass # Rolled back to the savepoint, find the failing rows below
+
+            for (index, params) in enumerate(seq_of_params):
+                try:
+                    with self.transaction(conn):
+                        cursor = self.execute(query, params, conn=conn)
+                        total += max(cursor.rowcount, 0)
+                except sqlite3.IntegrityError as e:
+                    failures.append((index, params, str(e)))
+
+        return (total, failures);
+
+    def execute_batch(self, statements, conn=None):
+        """
+        Run a sequence of (query, params) pairs in one transaction.
+        Either all of them are applied or none. Returns the total affected rows.
+        """
+        total = 0
+        with self.transaction(conn) as conn:
+            for query, params in statements:
+                cursor = self.execute(query, params, conn=conn)
+                total += max(cursor.rowcount, 0) # rowcount is -1 for non-DML statements
+
+        return total;
+
+    def fetchall(self, query, params=None, conn=None):
         """Execute a query and return all rows."""
-        self.ensure_connection()
+        conn = conn or self.get_connection()
+        if params is None:
+            params = ()
+
+        with self._timed(conn, query, params) as result:
+            rows = conn.execute(query, params).fetchall()
+            result["rows"] = len(rows)
+
+        return rows;
+
+    def iter_chunks(self, query, params=None, chunk_size=500, cancel_event=None, conn=None, first_chunk_size=None):
+        """
+        Generator over the result of `query` in lists of at most `chunk_size` rows
+        (built on cursor.fetchmany), so only one chunk is in memory at a time.
+        A smaller `first_chunk_size` hands over the first rows as soon as they are found.
+
+        Stops early when `cancel_event` (a threading.Event) is set or when the
+        consumer closes the generator; the cursor is closed either way.
+        """
+        conn = conn or self.get_connection()
         if params is None:
             params = ()
-        self.cursor.execute(query, params)
 
-        return self.cursor.fetchall();
-    
+        stopwatch = Stopwatch() # Only time spent inside SQLite, not in the consumer
+        n_rows = 0
+        cursor = None
+        error = None
+        self._start_timing()
+        try:
+            with stopwatch:
+                cursor = conn.execute(query, params)
+            size = first_chunk_size or chunk_size
+            while cancel_event is None or not cancel_event.is_set():
+                with stopwatch:
+                    rows = cursor.fetchmany(size)
+                if not rows:
+                    break
+                n_rows += len(rows)
+                size = chunk_size
+                yield rows
+        except sqlite3.Error as e:
+            error = e # e.g. interrupted by a cancel or a time budget
+            raise
+        finally:
+            if cursor is not None:
+                cursor.close() # Finalizes the statement and ends its read snapshot
+            self._record(conn, query, params, len(params), n_rows, stopwatch.elapsed, error=error)
+
+        return;
+
+    def iter_query(self, query, params=None, chunk_size=500, cancel_event=None, conn=None):
+        """
+        Generator over the rows of `query`, fetched `chunk_size` at a time.
+        Memory use is constant regardless of the result size:
+
+            for row in db.iter_query('SELECT * FROM "client_orders"'):
+                ...
+        """
+        for rows in self.iter_chunks(query, params, chunk_size, cancel_event, conn):
+            yield from rows
+
+        return;
+
+    # ------------------- Schema metadata (cached) -------------------
+    def _schema(self):
+        """
+        Return the cached schema, rebuilding it only when PRAGMA schema_version
+        says the schema changed (CREATE/ALTER/DROP from any connection).
+
+        Worker threads check it on a pooled connection taken for this lookup only,
+        so a metadata lookup never keeps a connection bound to the thread.
+        """
+        if threading.get_ident() == self._owner_thread:
+            self.ensure_connection()
+            return self._read_schema(self.conn);
+
+        with self.connection() as conn:
+            return self._read_schema(conn);
+
+    def _read_schema(self, conn):
+        """_schema() on `conn`: compare schema_version with the cache, re-read the schema if it changed."""
+        version = conn.execute("PRAGMA schema_version").fetchone()[0]
+
+        with self._schema_lock:
+            if self._schema_cache is not None and self._schema_cache["version"] == version:
+                return self._schema_cache;
+
+            rows = self.fetchall(
+                "SELECT name, sql "
+                "FROM sqlite_master "
+                "WHERE type='table' "
+                "ORDER BY rowid;",
+                conn=conn
+            )
+            # Virtual tables (the FTS5 indexes) and their shadow tables ("<name>_data", ...) are not user tables
+            virtual = [name for (name, sql) in rows if (sql or "").upper().startswith("CREATE VIRTUAL TABLE")]
+            tables = [
+                name for (name, _) in rows
+                if not name.startswith('sqlite_')
+                and not any(name == v or name.startswith(f"{v}_") for v in virtual)
+            ]
+            meta = {table: self._read_table_meta(conn, table) for table in tables}
+            # Full-text index of a table: the virtual table "<table>_fts" (see ourDB/schema.sql)
+            fulltext = {
+                table: {
+                    "name": f"{table}{FULLTEXT_SUFFIX}",
+                    "columns": [col[1] for col in self.fetchall(f'PRAGMA table_info("{table}{FULLTEXT_SUFFIX}");', conn=conn)]
+                }
+                for table in tables if f"{table}{FULLTEXT_SUFFIX}" in virtual
+            }
+            self._schema_cache = {"version": version, "tables": tables, "meta": meta, "fulltext": fulltext}
+
+        return self._schema_cache;
+
+    def _read_table_meta(self, conn, table_name):
+        """Introspect one table: columns, declared types, primary key and foreign keys."""
+        columns = self.fetchall(f'PRAGMA table_info("{table_name}");', conn=conn)
+        # PRAGMA table_info -> (cid, name, type, notnull, dflt_value, pk)
+        pk_cols = [col[1] for col in sorted((c for c in columns if c[5] != 0), key=lambda c: c[5])]
+
+        foreign_keys = []
+        # PRAGMA foreign_key_list -> (id, seq, table, from, to, on_update, on_delete, match)
+        for fk in self.fetchall(f'PRAGMA foreign_key_list("{table_name}");', conn=conn):
+            foreign_keys.append({
+                "column":     fk[3],
+                "ref_table":  fk[2],
+                "ref_column": fk[4],
+                "on_update":  fk[5],
+                "on_delete":  fk[6],
+            })
+
+        return {
+            "columns":      columns,
+            "col_names":    [col[1] for col in columns],
+            "types":        {col[1]: (col[2] or "").lower() for col in columns},
+            "pk_cols":      pk_cols,
+            "foreign_keys": foreign_keys,
+        };
+
+    def invalidate_schema_cache(self):
+        """Force the next metadata lookup to re-read the schema."""
+        with self._schema_lock:
+            self._schema_cache = None
+
+        return;
+
     def get_table_list(self):
         """Returns a list of all user tables in the database."""
-        tables = self.fetchall(
-            "SELECT name "
-            "FROM sqlite_master "
-            "WHERE type='table';"
-        )
+        return list(self._schema()["tables"]);
+
+    def get_table_meta(self, table_name):
+        """
+        Cached metadata of a table as a dict with the keys
+        columns (PRAGMA table_info rows), col_names, types, pk_cols and foreign_keys.
+        """
+        return self._schema()["meta"][table_name];
 
-        return [t[0] for t in tables if not t[0].startswith('sqlite_')];
-    
     def get_table_columns(self, table_name):
-        """Use PRAGMA table_info to get columns in a table."""
-        return self.fetchall(f'PRAGMA table_info("{table_name}");');
+        """PRAGMA table_info rows of a table (served from the schema cache)."""
+        return self.get_table_meta(table_name)["columns"];
+
+    def get_fulltext_index(self, table_name, col_name=None):
+        """
+        Full-text (FTS5) index of a table as a dict with the keys name and columns,
+        None if the table has none (or, with `col_name`, if it does not cover that column).
+        """
+        index = self._schema()["fulltext"].get(table_name)
+        if index is None or (col_name is not None and col_name not in index["columns"]):
+            return None;
+
+        return index;
+
+    def get_primary_key(self, table_name):
+        """
+        Primary key column names of a table, in key order.
+        Tables without a declared primary key fall back to all of their columns.
+        """
+        meta = self.get_table_meta(table_name)
+
+        return meta["pk_cols"] or meta["col_names"];
+
+    # ------------------- Change tracking -------------------
+    def affected_tables(self, table_name, operation):
+        """
+        Tables whose rows can change when `operation` ("insert", "update" or
+        "delete") runs on `table_name`: the table itself plus every table that
+        references it, directly or transitively, through an ON DELETE / ON UPDATE
+        CASCADE, SET NULL or SET DEFAULT foreign key. RESTRICT and NO ACTION keys
+        are skipped, they make the write fail instead of changing other rows.
+        """
+        if operation == "insert":
+            return [table_name];
+
+        meta = self._schema()["meta"]
+        affected = [table_name]
+        pending = [(table_name, operation)]
+        while pending:
+            (parent, parent_op) = pending.pop()
+            action_key = "on_delete" if parent_op == "delete" else "on_update"
+            for child, child_meta in meta.items():
+                for fk in child_meta["foreign_keys"]:
+                    action = (fk[action_key] or "").upper()
+                    if fk["ref_table"] != parent or action not in _PROPAGATING_ACTIONS:
+                        continue
+                    # CASCADE on delete deletes the child rows, anything else updates them
+                    child_op = "delete" if (parent_op == "delete" and action == "CASCADE") else "update"
+                    if child not in affected:
+                        affected.append(child)
+                        pending.append((child, child_op))
+
+        return affected;
+
+    def mark_changed(self, tables):
+        """
+        Bump the change counter of every table in `tables` (after a write, see
+        affected_tables). Called on the Tk thread it also checks PRAGMA data_version:
+        if another connection committed since the last poll (another process, or the
+        pooled connection this write may have used), which tables it changed is
+        unknown, so all of them are bumped before the baseline moves on.
+        """
+        if threading.get_ident() == self._owner_thread and self.conn and self._take_data_version():
+            tables = self.get_table_list()
+
+        with self._versions_lock:
+            for table in tables:
+                self._table_versions[table] = self._table_versions.get(table, 0) + 1
+
+        return;
+
+    def table_version(self, table_name):
+        """Change counter of a table: different value = its rows may have changed since."""
+        with self._versions_lock:
+            return self._table_versions.get(table_name, 0);
+
+    def data_version(self):
+        """PRAGMA data_version of the main connection: changes whenever another connection commits."""
+        self.ensure_connection()
+
+        return self.conn.execute("PRAGMA data_version").fetchone()[0];
+
+    def poll_external_changes(self):
+        """
+        True if another connection (another process, or a pooled connection of
+        this one that did not call mark_changed) committed since the last poll.
+        Which tables changed is unknown, so all of them are marked as changed.
+        Cheap enough to call every second: PRAGMA data_version reads no pages.
+        """
+        self.ensure_connection()
+        changed = self._take_data_version()
+        if changed:
+            self.mark_changed(self.get_table_list())
+
+        return changed;
+
+    def _take_data_version(self):
+        """Tk thread: make the current PRAGMA data_version the baseline; True if it moved since the last one."""
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = self._data_version is not None and version != self._data_version
+        self._data_version = version
+
+        return changed;
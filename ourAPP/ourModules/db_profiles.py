@@ -0,0 +1,90 @@
+# ourModules/db_profiles.py
+
+# Named SQLite performance profiles, applied by the DatabaseManager at connect time.
+# The numbers were chosen with ourAPP/benchmarks/bench_profiles.py on generated
+# databases (scale factor 1000 -> 50.000 client orders), see that script for details.
+
+PERFORMANCE_PROFILES = {
+    # Everyday use of the GUI: many small single-row commits, short reads.
+    "interactive": {
+        "journal_mode": "WAL",
+        "synchronous":  "NORMAL", # With WAL: no fsync per commit, still safe against app crashes
+        "cache_size":   -16000,   # Negative = KiB -> ~16 MB page cache
+        "mmap_size":    None,
+        "temp_store":   None,
+    },
+    # Scripted / CSV loads: one big transaction, durability of the load itself does not matter
+    # (a failed load is simply repeated).
+    "bulk_load": {
+        "journal_mode": "WAL",
+        "synchronous":  "OFF",
+        "cache_size":   -128000,  # ~128 MB, keeps the indexes being built in memory
+        "mmap_size":    None,     # Writes do not benefit from mmap
+        "temp_store":   None,
+    },
+    # Statistics / search: large scans, GROUP BY and ORDER BY on read-only connections.
+    "read_only_analytics": {
+        "journal_mode": None,     # Cannot be changed on a read-only connection (the file already is WAL)
+        "synchronous":  None,
+        "cache_size":   -64000,   # ~64 MB: pooled read-only connections are reused, so the cache pays off
+        "mmap_size":    None,     # Measured: no gain once the file is in the OS cache (see read_only_mmap_size)
+        "temp_store":   None,     # Measured: MEMORY made the big ORDER BY / GROUP BY sorts ~20% slower
+    },
+}
+
+DEFAULT_PROFILE = "interactive"
+# Profiles fit for the read-write connections: they put the file in WAL mode, which is
+# what lets the read-only snapshot connections read without ever blocking a writer
+READ_WRITE_PROFILES = [name for (name, settings) in PERFORMANCE_PROFILES.items() if settings["journal_mode"] == "WAL"]
+DEFAULT_READ_ONLY_PROFILE = "read_only_analytics"
+
+# Order matters: journal_mode must be set before anything else touches the file
+PRAGMA_ORDER = ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store")
+
+def get_profile(name: str) -> dict:
+    """
+    Return the PRAGMA settings of a profile.
+    Raises ValueError for an unknown profile name.
+    """
+    try:
+        return PERFORMANCE_PROFILES[name];
+    except KeyError:
+        raise ValueError(
+            f"Unknown performance profile '{name}'. "
+            f"Choose one of: {', '.join(PERFORMANCE_PROFILES)}"
+        ) from None
+
+def profile_pragmas(name: str, read_only: bool = False) -> list:
+    """
+    The PRAGMA statements of a profile, in the order they must run.
+    Settings a read-only connection cannot change are skipped when `read_only`.
+    """
+    settings = get_profile(name)
+    statements = []
+    for pragma in PRAGMA_ORDER:
+        value = settings.get(pragma)
+        if value is None:
+            continue
+        if read_only and pragma in ("journal_mode", "synchronous"):
+            continue
+        statements.append(f"PRAGMA {pragma} = {value}")
+
+    return statements;
+
+def apply_profile(conn, name: str, read_only: bool = False):
+    """Run the PRAGMAs of profile `name` on an open sqlite3 connection."""
+    for statement in profile_pragmas(name, read_only):
+        conn.execute(statement)
+
+    return;
+
+def main():
+    for name in PERFORMANCE_PROFILES:
+        print(f"{name}:")
+        for statement in profile_pragmas(name):
+            print(f"    {statement}")
+
+    return;
+
+if __name__ == "__main__":
+    main()
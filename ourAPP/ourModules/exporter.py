@@ -0,0 +1,146 @@
+# ourModules/exporter.py
+
+import os
+import csv
+import json
+from tkinter import filedialog, messagebox
+
+from ourModules.translations import compile_row_to_display
+from ourModules.progress_window import ProgressWindow
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+class QueryExporter:
+    """
+    Streams the rows of one SELECT (a whole table, a search, a statistics query)
+    to a CSV or JSON Lines file, `chunk_size` rows at a time straight from the
+    cursor (DatabaseManager.iter_chunks), so memory use does not depend on the
+    size of the result.
+
+    With `display=True` the values are written as the GUI shows them
+    (compile_row_to_display, e.g. specialisation 2 -> "Writer").
+    """
+    def __init__(self, db_manager, query, params=(), chunk_size=2000):
+        self.db_manager = db_manager
+        self.query = query.strip().rstrip(";")
+        self.params = tuple(params or ())
+        self.chunk_size = chunk_size
+
+        return;
+
+    def column_names(self, conn=None):
+        """Result column names, without running the query (LIMIT 0)."""
+        cursor = self.db_manager.execute(f"SELECT * FROM ({self.query}) LIMIT 0", self.params, conn=conn)
+
+        return [description[0] for description in cursor.description];
+
+    def count(self, conn=None):
+        """Number of rows the export will write (for the progress bar)."""
+        rows = self.db_manager.fetchall(f"SELECT COUNT(*) FROM ({self.query})", self.params, conn=conn)
+
+        return rows[0][0];
+
+    def run(self, path, fmt="csv", display=False, conn=None, cancel_event=None, progress=None):
+        """
+        Write the result to `path` in `fmt` ("csv" or "jsonl").
+
+        :param conn:         connection to read with; a snapshot (DatabaseManager.snapshot)
+                             makes the count and the rows consistent with each other
+        :param cancel_event: threading.Event checked between chunks; the partial file is removed
+        :param progress:     progress(rows_written, total_rows) after every chunk
+        :return: dict with rows, path and cancelled
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}'. Choose one of: {', '.join(EXPORT_FORMATS)}")
+
+        col_names = self.column_names(conn)
+        total = self.count(conn) if progress is not None else None
+        summary = {"rows": 0, "path": path, "cancelled": False}
+        row_to_display = compile_row_to_display(col_names)
+
+        try:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                if fmt == "csv":
+                    writer = csv.writer(f)
+                    writer.writerow(col_names)
+
+                for chunk in self.db_manager.iter_chunks(self.query, self.params, self.chunk_size, cancel_event, conn):
+                    if display:
+                        chunk = [row_to_display(row) for row in chunk]
+                    if fmt == "csv":
+                        writer.writerows(chunk)
+                    else:
+                        f.writelines(
+                            json.dumps(dict(zip(col_names, row)), ensure_ascii=False, default=str) + "\n"
+                            for row in chunk
+                        )
+                    summary["rows"] += len(chunk)
+                    if progress is not None:
+                        progress(summary["rows"], total)
+        except BaseException:
+            os.remove(path) # Half a file is worse than none (e.g. interrupted by a cancel)
+            raise
+
+        if cancel_event is not None and cancel_event.is_set():
+            os.remove(path)
+            summary["cancelled"] = True
+
+        return summary;
+
+def export_with_progress(parent, query_executor, exporter, title, initial_name="export"):
+    """
+    Ask for a file name (the extension picks the format), then run `exporter`
+    in the background with a ProgressWindow (progress + cancel).
+    """
+    path = filedialog.asksaveasfilename(
+        parent=parent, title=title, initialfile=f"{initial_name}.csv", defaultextension=".csv",
+        filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")]
+    )
+    if not path:
+        return None;
+
+    fmt = "jsonl" if path.lower().endswith((".jsonl", ".json")) else "csv"
+    display = messagebox.askyesno(
+        "Export", "Write values as they are shown (e.g. \"Writer\" instead of 2)?", parent=parent
+    )
+    task = None
+
+    def on_cancel():
+        task.cancel()
+        progress.finish()
+
+        return;
+
+    progress = ProgressWindow(parent, title, on_cancel=on_cancel)
+
+    def job(conn, task):
+        return exporter.run(
+            path, fmt, display, conn=conn, cancel_event=task.cancel_event,
+            progress=lambda rows, total: task.report((rows, total))
+        );
+
+    def on_progress(value):
+        (rows, total) = value
+        fraction = rows / total if total else None
+        progress.update_progress(f"{rows} of {total} rows written", fraction)
+
+        return;
+
+    def on_done(summary):
+        progress.finish()
+        if not summary["cancelled"]:
+            messagebox.showinfo("Export", f"{summary['rows']} rows written to\n{summary['path']}", parent=parent)
+
+        return;
+
+    def on_error(e):
+        progress.finish()
+        messagebox.showerror("Error", f"Export failed.\n{e}", parent=parent)
+
+        return;
+
+    task = query_executor.submit(
+        job, on_done=on_done, on_error=on_error, on_progress=on_progress, tag=f"Export: {initial_name}"
+    )
+
+    return task;
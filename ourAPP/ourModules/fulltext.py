@@ -0,0 +1,116 @@
+# ourModules/fulltext.py
+
+import os
+from difflib import get_close_matches
+
+MIN_MATCH_LENGTH = 3 # The trigram tokenizer cannot look up shorter strings
+SUGGESTION_CANDIDATES = 50 # Values re-ranked by suggest_value()
+
+DEFAULT_SCHEMA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "ourDB", "schema.sql"
+)
+
+def match_phrase(value: str) -> str:
+    """FTS5 phrase of `value` (double quotes doubled), matched as a substring by the trigram tokenizer."""
+    return '"' + value.replace('"', '""') + '"';
+
+def fulltext_predicate(db_manager, table_name, col_name, value):
+    """
+    WHERE clause and parameters that find the rows of `table_name` whose `col_name`
+    contains `value` (LIKE '%value%') through the table's FTS5 index
+    (see ourDB/schema.sql) instead of a table scan.
+
+    Returns None when the index cannot answer it (no index on that column, a value
+    shorter than MIN_MATCH_LENGTH, or LIKE wildcards in it): the caller keeps its LIKE.
+    """
+    index = db_manager.get_fulltext_index(table_name, col_name)
+    if index is None or len(value) < MIN_MATCH_LENGTH or "%" in value or "_" in value:
+        return None;
+
+    fts = index["name"]
+    subquery = f'SELECT "rowid" FROM "{fts}" WHERE "{fts}"."{col_name}" MATCH ?'
+
+    return (f'"rowid" IN ({subquery})', (match_phrase(value), ));
+
+def trigrams(value: str) -> list:
+    """Distinct trigrams of `value`, lower case like the tokenizer's, in order of appearance."""
+    text = value.lower()
+
+    return list(dict.fromkeys(text[i:i + 3] for i in range(len(text) - 2)));
+
+def suggest_value(db_manager, table_name, col_name, value, conn=None, candidates=SUGGESTION_CANDIDATES, cutoff=0.8):
+    """
+    "Did you mean" value of `col_name` closest to `value`, None if nothing is close enough.
+
+    Candidates come from the full-text index: the rows sharing most trigrams with
+    `value` (an OR of its trigrams, best `candidates` by bm25 rank). Only those
+    are re-ranked with difflib, so the column itself is never read in full.
+    Columns without a full-text index get no suggestion.
+    """
+    index = db_manager.get_fulltext_index(table_name, col_name)
+    grams = trigrams(value)
+    if index is None or not grams:
+        return None;
+
+    fts = index["name"]
+    query = (
+        f'SELECT DISTINCT "{col_name}" FROM "{table_name}" WHERE "rowid" IN ('
+        f'SELECT "rowid" FROM "{fts}" WHERE "{fts}"."{col_name}" MATCH ? ORDER BY "rank" LIMIT ?)'
+    )
+    params = (" OR ".join(match_phrase(gram) for gram in grams), candidates)
+    values = [str(row[0]) for row in db_manager.iter_query(query, params, conn=conn) if row[0] is not None]
+    matches = get_close_matches(value, values, n=1, cutoff=cutoff)
+
+    return matches[0] if matches else None;
+
+def rebuild_fulltext(db_manager, schema_path=DEFAULT_SCHEMA_PATH, progress=None):
+    """
+    Bring an existing database up to date with schema.sql (every statement is
+    IF NOT EXISTS: missing indexes, FTS tables and triggers are created) and
+    rebuild every full-text index from its table.
+
+    :param progress: progress(table_name) before each index is rebuilt
+    :return: names of the tables whose index was rebuilt
+    """
+    with open(schema_path, "r", encoding="utf-8") as f:
+        schema_sql = f.read()
+
+    conn = db_manager.get_connection()
+    conn.executescript(schema_sql)
+    db_manager.invalidate_schema_cache()
+
+    rebuilt = []
+    with db_manager.transaction() as conn:
+        for table in db_manager.get_table_list():
+            index = db_manager.get_fulltext_index(table)
+            if index is None:
+                continue
+            if progress is not None:
+                progress(table)
+            db_manager.execute(f'INSERT INTO "{index["name"]}" ("{index["name"]}") VALUES (\'rebuild\')', conn=conn)
+            db_manager.execute(f'INSERT INTO "{index["name"]}" ("{index["name"]}") VALUES (\'optimize\')', conn=conn)
+            rebuilt.append(table)
+
+    return rebuilt;
+
+def main():
+    """Command line rebuild, run from ourAPP/: python -m ourModules.fulltext DB"""
+    import argparse
+    from time import perf_counter
+    from ourModules.database_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Create / rebuild the full-text indexes of a publishing house database")
+    parser.add_argument("db", help="Path of the SQLite database file")
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA_PATH, help="schema.sql to bring the database up to date with")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.db)
+    start = perf_counter()
+    rebuilt = rebuild_fulltext(db_manager, args.schema, progress=lambda table: print(f"Rebuilding {table}…"))
+    print(f"{len(rebuilt)} full-text indexes rebuilt in {perf_counter() - start:.2f} s")
+    db_manager.close_connection()
+
+    return;
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# ourModules/global_search.py
+
+import sqlite3
+from time import perf_counter
+
+from ourModules.translations import get_lookup_view
+from ourModules.query_builder import compile_predicate, is_numeric_type
+
+TABLE_TIME_BUDGET_MS = 500 # A table not done by then returns what it found so far
+MAX_ROWS_PER_TABLE = 100
+
+def as_number(value: str):
+    """'9781234' -> 9781234, '12.5' -> 12.5, anything else -> None."""
+    for convert in (int, float):
+        try:
+            return convert(value);
+        except ValueError:
+            pass
+
+    return None;
+
+def table_search(db_manager, table_name, value, limit=MAX_ROWS_PER_TABLE):
+    """
+    "Search everywhere" query of one table: every column that can hold `value`,
+    OR-ed together, as (query, params, matched column names); None if no column fits.
+
+        numeric columns      = number       (only if `value` is a number, e.g. an ISBN or a tax id)
+        display-mapped ones  label LIKE     (e.g. "Writer", through the lookup view)
+        text columns         LIKE           (full-text MATCH where there is an FTS index; text columns
+                                             without one are only scanned for values that are not numbers)
+    """
+    meta = db_manager.get_table_meta(table_name)
+    number = as_number(value)
+
+    predicates = []
+    for col_name in meta["col_names"]:
+        declared_type = meta["types"].get(col_name, "")
+        if get_lookup_view(col_name) is not None:
+            if number is None:
+                predicates.append((col_name, compile_predicate(db_manager, table_name, col_name, "LIKE", value)))
+        elif is_numeric_type(declared_type):
+            if number is not None:
+                predicates.append((col_name, (f'"{col_name}" = ?', (number, ))))
+        elif number is None or db_manager.get_fulltext_index(table_name, col_name) is not None:
+            predicates.append((col_name, compile_predicate(db_manager, table_name, col_name, "LIKE", value)))
+
+    if not predicates:
+        return None;
+
+    where_clause = " OR ".join(f"({sql})" for (_, (sql, _)) in predicates)
+    params = tuple(param for (_, (_, condition_params)) in predicates for param in condition_params)
+    query = f'SELECT * FROM "{table_name}" WHERE {where_clause} LIMIT {int(limit)}'
+
+    return (query, params, [col_name for (col_name, _) in predicates]);
+
+def search_table(db_manager, table_name, search, conn, budget_ms=TABLE_TIME_BUDGET_MS, cancel_event=None):
+    """
+    Run `search`, the table_search() of one table, on `conn` (a worker's read-only connection)
+    within `budget_ms`: past the budget SQLite is stopped (progress handler) and the rows
+    found so far are returned. table_search() reads the schema cache, so call it on the
+    Tk thread and hand only its result to the worker; this function touches nothing but `conn`.
+
+    :return: dict with table, columns (matched), rows, timed_out, elapsed (seconds)
+    """
+    (query, params, columns) = search
+    result = {"table": table_name, "columns": columns, "rows": [], "timed_out": False, "elapsed": 0.0}
+    start = perf_counter()
+    deadline = start + budget_ms / 1000
+
+    # Called every 1000 SQLite VM instructions: a non-zero return aborts the statement ("interrupted")
+    conn.set_progress_handler(lambda: perf_counter() > deadline, 1000)
+    try:
+        for chunk in db_manager.iter_chunks(query, params, cancel_event=cancel_event, conn=conn, first_chunk_size=20):
+            result["rows"].extend(chunk)
+    except sqlite3.OperationalError:
+        if cancel_event is not None and cancel_event.is_set() or perf_counter() <= deadline:
+            raise # Cancelled by the user, or a real error
+        result["timed_out"] = True
+    finally:
+        conn.set_progress_handler(None, 0) # The connection goes back to the pool
+    result["elapsed"] = perf_counter() - start
+
+    return result;
+
+def main():
+    """Demo, run from ourAPP/: python -m ourModules.global_search DB VALUE"""
+    import sys
+    from ourModules.database_manager import DatabaseManager
+
+    db_manager = DatabaseManager(sys.argv[1])
+    value = sys.argv[2]
+    with db_manager.snapshot() as conn:
+        for table in db_manager.get_table_list():
+            search = table_search(db_manager, table, value)
+            if search is None:
+                print(f"{table:<24} | no compatible column")
+                continue
+            result = search_table(db_manager, table, search, conn)
+            print(
+                f"{table:<24} | {len(result['rows']):>4} rows | {result['elapsed'] * 1000:7.1f} ms"
+                f"{' (timed out)' if result['timed_out'] else ''} | {', '.join(result['columns'])}"
+            )
+    db_manager.close_connection()
+
+    return;
+
+if __name__ == "__main__":
+    main()
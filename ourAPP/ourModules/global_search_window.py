@@ -0,0 +1,167 @@
+# ourModules/global_search_window.py
+
+from time import perf_counter
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from ourModules.query_executor import QueryExecutor
+from ourModules.global_search import table_search, search_table, TABLE_TIME_BUDGET_MS, MAX_ROWS_PER_TABLE
+from ourModules.translations import compile_row_to_display, table_to_display
+
+GLOBAL_SEARCH_WORKERS = 4 # Tables searched at the same time, each on its own read-only connection
+
+class GlobalSearchWindow(tk.Toplevel):
+    """
+    "Search everywhere": one value searched in every table and every column that
+    can hold it (see global_search.table_search). The tables are searched in
+    parallel on a small pool of read-only connections, and each table's rows
+    appear, grouped under the table, as soon as that table is done. A table gets
+    TABLE_TIME_BUDGET_MS: past that it shows what it found so far.
+    """
+    def __init__(self, parent, main_app, db_manager, value):
+        super().__init__(parent)
+
+        self.title(f"🔎 Everywhere: {value}")
+        self.main_app = main_app
+        self.db_manager = db_manager
+        self.value = value
+        self.item_keys = {}  # Treeview item -> (table, primary key) of a result row
+        self.pending = 0     # Tables still being searched
+        self.n_rows = 0
+        self.timed_out = []  # Tables that used up their time budget
+        # Own executor: its workers only serve this search, so the tables really run side by side
+        self.executor = QueryExecutor(self, db_manager, workers=GLOBAL_SEARCH_WORKERS)
+
+        container = ttk.Frame(self, padding=10)
+        container.pack(expand=True, fill='both')
+
+        lbl_title = ttk.Label(container, text=f"- Every table containing '{value}' -", font=('Arial', 14, 'bold'))
+        lbl_title.pack(pady=5)
+
+        tree_frame = ttk.Frame(container)
+        tree_frame.pack(expand=True, fill='both', pady=5)
+
+        scroll_y = ttk.Scrollbar(tree_frame, orient="vertical")
+        scroll_y.pack(side="right", fill="y")
+
+        self.results_tree = ttk.Treeview(tree_frame, columns=("row", ), show='tree headings', yscrollcommand=scroll_y.set)
+        self.results_tree.heading("#0", text="Table / Key")
+        self.results_tree.heading("row", text="Row")
+        self.results_tree.column("#0", width=260, stretch=False)
+        self.results_tree.column("row", width=900, anchor='w')
+        self.results_tree.pack(side="left", fill="both", expand=True)
+        scroll_y.config(command=self.results_tree.yview)
+        self.results_tree.bind("<Double-1>", lambda event: self.select_for_editing())
+
+        bottom_frame = ttk.Frame(container)
+        bottom_frame.pack(fill='x', pady=5)
+
+        self.lbl_status = ttk.Label(bottom_frame, text="Searching…")
+        self.lbl_status.pack(side='left', padx=10)
+
+        btn_select = ttk.Button(bottom_frame, text="Edit selected", command=self.select_for_editing)
+        btn_select.pack(side='right', padx=10)
+
+        self.bind("<Destroy>", self.on_destroy)
+        self.start_time = perf_counter()
+        self.start_search()
+
+        return;
+
+    def on_destroy(self, event):
+        """Stop the searches still running when the window closes."""
+        if event.widget is self:
+            self.executor.shutdown()
+
+        return;
+
+    def start_search(self):
+        """
+        One task per table; each delivers its group when done. The queries are built
+        here, on the Tk thread (schema cache), so the workers only run SQL on their own connection.
+        """
+        for table in self.db_manager.get_table_list():
+            search = table_search(self.db_manager, table, self.value)
+            if search is None:
+                continue # No column of the table can hold the value
+            self.pending += 1
+            self.executor.submit(
+                lambda conn, task, table=table, search=search: search_table(
+                    self.db_manager, table, search, conn, cancel_event=task.cancel_event
+                ),
+                on_done=self.add_table_results,
+                on_error=lambda e, table=table: self.add_table_error(table, e),
+                tag=f"Search everywhere: {table}"
+            )
+
+        if self.pending == 0:
+            self.lbl_status.config(text=f"No table has a column that can hold '{self.value}'.")
+
+        return;
+
+    def add_table_results(self, result):
+        """Tk thread: show one table's rows under a node of the table (tables without a match are left out)."""
+        if result["rows"]:
+            table = result["table"]
+            col_names = self.db_manager.get_table_meta(table)["col_names"]
+            pk_idx = [col_names.index(col) for col in self.db_manager.get_primary_key(table)]
+            row_to_display = compile_row_to_display(col_names)
+
+            n_found = len(result["rows"])
+            notes = []
+            if n_found >= MAX_ROWS_PER_TABLE:
+                notes.append(f"first {MAX_ROWS_PER_TABLE}")
+            if result["timed_out"]:
+                notes.append(f"stopped after {TABLE_TIME_BUDGET_MS} ms")
+            parent = self.results_tree.insert(
+                "", "end", open=True,
+                text=f"{table_to_display(table)} ({n_found} rows{', ' + ', '.join(notes) if notes else ''})",
+                values=(f"matched in: {', '.join(result['columns'])}  [{result['elapsed'] * 1000:.0f} ms]", )
+            )
+            for row in result["rows"]:
+                key = tuple(row[i] for i in pk_idx)
+                display = row_to_display(row)
+                iid = self.results_tree.insert(
+                    parent, "end", text=", ".join(str(value) for value in key),
+                    values=("  |  ".join(f"{col}: {value}" for col, value in zip(col_names, display)), )
+                )
+                self.item_keys[iid] = (table, key)
+            self.n_rows += n_found
+
+        if result["timed_out"]:
+            self.timed_out.append(result["table"])
+
+        self.table_finished()
+
+        return;
+
+    def add_table_error(self, table, e):
+        self.results_tree.insert("", "end", text=f"{table_to_display(table)} (failed)", values=(str(e), ))
+        self.table_finished()
+
+        return;
+
+    def table_finished(self):
+        self.pending -= 1
+        elapsed = perf_counter() - self.start_time
+        status = f"{self.n_rows} rows found in {len(self.results_tree.get_children())} tables, {elapsed:.3f} seconds"
+        if self.pending > 0:
+            status += f" — {self.pending} tables still searching…"
+        if self.timed_out:
+            status += f" — partial results from: {', '.join(self.timed_out)}"
+        self.lbl_status.config(text=status)
+
+        return;
+
+    def select_for_editing(self):
+        """Open the selected result row in its table tab."""
+        selected = [iid for iid in self.results_tree.selection() if iid in self.item_keys]
+        if not selected:
+            messagebox.showwarning("No selection", "Please select a result row first.", parent=self)
+
+            return;
+
+        (table, key) = self.item_keys[selected[0]]
+        self.main_app.select_row_in_table(table, key)
+
+        return;
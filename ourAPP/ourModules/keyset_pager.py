@@ -0,0 +1,196 @@
+# ourModules/keyset_pager.py
+
+import json
+
+def key_to_iid(key):
+    """
+    Encode a primary key (tuple of raw values) as a TreeView item id, e.g.
+    (123,) -> '[123]' and ('AB123', '978-1') -> '["AB123","978-1"]'.
+    JSON keeps the types, so iid_to_key() gives back the exact values.
+    """
+    return json.dumps(list(key), separators=(",", ":"), ensure_ascii=False);
+
+def iid_to_key(iid):
+    """Decode a TreeView item id made by key_to_iid() back to the key tuple."""
+    return tuple(json.loads(iid));
+
+class KeysetPager:
+    """
+    Builds the SELECTs of a keyset-paginated table view.
+
+    Rows are ordered by the primary key and every page continues from the key of
+    the last (or first) row already shown, e.g.
+
+        SELECT * FROM "client_orders" WHERE "order_id" > ? ORDER BY "order_id" LIMIT 200
+
+    so fetching any page is an index range scan, however deep the user scrolls
+    (unlike LIMIT/OFFSET, which reads and throws away every skipped row).
+    Composite keys use row values: ("a", "b") > (?, ?).
+
+    With `sort_col` the rows are ordered by that column first and the primary key
+    breaks ties, so the "order key" of a row is (sort value, *primary key):
+
+        ... WHERE ("order date", "order_id") > (?, ?) ORDER BY "order date", "order_id" LIMIT 200
+
+    which an index on "order date" serves directly. Pass `sort_nullable=False` when
+    the sort column holds no NULLs: the NULL branch the queries need otherwise
+    (see _seek) turns some of those range searches into scans. `filters` are extra
+    (sql, params) predicates ANDed into every query, e.g. ('"quantity" >= ?', (10,)).
+    """
+    def __init__(self, table_name, col_names, key_cols, page_size=200, sort_col=None, descending=False,
+                 filters=(), sort_nullable=True):
+        self.table_name = table_name
+        self.col_names = list(col_names)
+        self.pk_cols = list(key_cols) # Usually the primary key (see DatabaseManager.get_primary_key)
+        self.page_size = page_size
+        self.sort_col = sort_col
+        self.descending = descending
+        self.filters = list(filters)
+
+        # Columns of the order key; a sort column that is not part of the primary key may be NULL
+        if sort_col is None:
+            self.key_cols = list(self.pk_cols)
+        else:
+            self.key_cols = [sort_col] + [col for col in self.pk_cols if col != sort_col]
+        self._nullable_first = sort_col is not None and sort_col not in self.pk_cols and sort_nullable
+
+        # Positions of the key columns inside a `SELECT *` row
+        self._key_idx = [self.col_names.index(col) for col in self.key_cols]
+        self._pk_idx = [self.col_names.index(col) for col in self.pk_cols]
+
+        return;
+
+    def is_plain(self):
+        """True when the view is the whole table in primary key order (no sort column, no filters)."""
+        return self.sort_col is None and not self.filters;
+
+    @staticmethod
+    def _row_expr(cols):
+        quoted = ", ".join(f'"{col}"' for col in cols)
+
+        return quoted if len(cols) == 1 else f"({quoted})";
+
+    @staticmethod
+    def _placeholders(n):
+        return "?" if n == 1 else f"({', '.join('?' for _ in range(n))})";
+
+    def _order_by(self, backward=False):
+        """ORDER BY list in view order (or reversed, when reading backwards)."""
+        direction = " DESC" if (self.descending != backward) else ""
+
+        return ", ".join(f'"{col}"{direction}' for col in self.key_cols);
+
+    def _seek(self, forward, key, inclusive=False):
+        """
+        (sql, params) selecting the rows after `key` in view order (before it if not
+        `forward`). SQLite sorts NULLs first, and a row value comparison with a NULL
+        is never true, so a nullable sort column gets an explicit IS NULL branch.
+        """
+        greater = forward != self.descending # Larger keys come later in the view?
+        op = (">" if greater else "<") + ("=" if inclusive else "")
+        key = tuple(key)
+
+        if not self._nullable_first:
+            return (f"{self._row_expr(self.key_cols)} {op} {self._placeholders(len(key))}", key);
+
+        sort_col = f'"{self.sort_col}"'
+        rest_cols = self.key_cols[1:]
+        if key[0] is None:
+            rest = f"{self._row_expr(rest_cols)} {op} {self._placeholders(len(rest_cols))}"
+            if greater: # Later NULLs, then every non-NULL value
+                return (f"(({sort_col} IS NULL AND {rest}) OR {sort_col} IS NOT NULL)", key[1:]);
+            return (f"({sort_col} IS NULL AND {rest})", key[1:]);
+
+        full = f"{self._row_expr(self.key_cols)} {op} {self._placeholders(len(key))}"
+        if greater:
+            return (full, key);
+        return (f"({full} OR {sort_col} IS NULL)", key);
+
+    def _where(self, *extra):
+        """WHERE clause (or "") of the filters plus `extra` (sql, params) predicates."""
+        predicates = self.filters + [p for p in extra if p is not None]
+        if not predicates:
+            return ("", ());
+
+        sql = " WHERE " + " AND ".join(f"({sql})" for (sql, _) in predicates)
+        params = tuple(param for (_, params) in predicates for param in params)
+
+        return (sql, params);
+
+    def _page(self, seek=None, backward=False):
+        (where, params) = self._where(seek)
+        sql = (
+            f'SELECT * FROM "{self.table_name}"{where} '
+            f'ORDER BY {self._order_by(backward)} LIMIT {int(self.page_size)}'
+        )
+
+        return (sql, params);
+
+    def row_key(self, row):
+        """The order key (tuple) of a raw `SELECT *` row."""
+        return tuple(row[i] for i in self._key_idx);
+
+    def row_pk(self, row):
+        """The primary key (tuple) of a raw `SELECT *` row."""
+        return tuple(row[i] for i in self._pk_idx);
+
+    def first_page(self):
+        """(sql, params) of the first page."""
+        return self._page();
+
+    def page_after(self, key):
+        """(sql, params) of the page following the row with order key `key`."""
+        return self._page(self._seek(True, key));
+
+    def page_before(self, key):
+        """
+        (sql, params) of the page preceding the row with order key `key`.
+        The rows come back in reverse view order; reverse them before display.
+        """
+        return self._page(self._seek(False, key), backward=True);
+
+    def page_at(self, key):
+        """(sql, params) of the page starting at the row with order key `key` (inclusive)."""
+        return self._page(self._seek(True, key, inclusive=True));
+
+    def row_by_key(self, key):
+        """(sql, params) of the single row with primary key `key` (ignores the filters)."""
+        sql = (
+            f'SELECT * FROM "{self.table_name}" '
+            f'WHERE {self._row_expr(self.pk_cols)} = {self._placeholders(len(self.pk_cols))}'
+        )
+
+        return (sql, tuple(key));
+
+    def rows_by_keys(self, keys):
+        """
+        (sql, params) of the rows with the primary keys `keys`, in one query (ignores the filters).
+        The keys go through a SELECT of the VALUES list: a bare IN (VALUES ...) of row values
+        makes SQLite scan the table instead of searching its primary key index.
+        """
+        values = ", ".join(f"({', '.join('?' for _ in self.pk_cols)})" for _ in keys)
+        columns = ", ".join(f"column{i + 1}" for i in range(len(self.pk_cols)))
+        sql = (
+            f'SELECT * FROM "{self.table_name}" '
+            f'WHERE {self._row_expr(self.pk_cols)} IN (SELECT {columns} FROM (VALUES {values}))'
+        )
+
+        return (sql, tuple(value for key in keys for value in key));
+
+    def count_before(self, key):
+        """(sql, params) counting the rows before order key `key` (the offset of that row)."""
+        (where, params) = self._where(self._seek(False, key))
+
+        return (f'SELECT COUNT(*) FROM "{self.table_name}"{where}', params);
+
+    def view_query(self):
+        """(sql, params) of every row of the view, in view order (no LIMIT), e.g. for an export."""
+        (where, params) = self._where()
+
+        return (f'SELECT * FROM "{self.table_name}"{where} ORDER BY {self._order_by()}', params);
+
+    def count_query(self):
+        """(sql, params) counting the rows of the view."""
+        (where, params) = self._where()
+
+        return (f'SELECT COUNT(*) FROM "{self.table_name}"{where}', params);
@@ -0,0 +1,60 @@
+# ourModules/progress_window.py
+
+import tkinter as tk
+from tkinter import ttk
+
+class ProgressWindow(tk.Toplevel):
+    """
+    Small window with a progress bar and a Cancel button, for long background
+    jobs (CSV import / export). `on_cancel` is called once when the user cancels
+    (button or window close); the owner closes the window with `finish()`.
+    """
+    def __init__(self, parent, title, on_cancel=None):
+        super().__init__(parent)
+
+        self.title(title)
+        self.resizable(False, False)
+        self.on_cancel = on_cancel
+
+        container = ttk.Frame(self, padding=15)
+        container.pack(expand=True, fill='both')
+
+        self.lbl_status = ttk.Label(container, text="Starting…", width=60)
+        self.lbl_status.pack(pady=5)
+
+        self.progress = ttk.Progressbar(container, orient="horizontal", length=400, mode="determinate", maximum=1.0)
+        self.progress.pack(pady=5)
+
+        self.cancel_btn = ttk.Button(container, text="Cancel", command=self.cancel)
+        self.cancel_btn.pack(pady=5)
+
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        return;
+
+    def update_progress(self, text, fraction=None):
+        """Show `text`; `fraction` (0..1) moves the bar, None = unknown total (bar bounces)."""
+        self.lbl_status.config(text=text)
+        if fraction is None:
+            if str(self.progress.cget("mode")) != "indeterminate":
+                self.progress.config(mode="indeterminate")
+                self.progress.start(15)
+        else:
+            self.progress.config(mode="determinate", value=min(max(fraction, 0.0), 1.0))
+
+        return;
+
+    def cancel(self):
+        if self.on_cancel is not None:
+            callback, self.on_cancel = self.on_cancel, None
+            self.lbl_status.config(text="Cancelling…")
+            self.cancel_btn.config(state="disabled")
+            callback()
+
+        return;
+
+    def finish(self):
+        self.progress.stop()
+        self.destroy()
+
+        return;
@@ -0,0 +1,228 @@
+# ourModules/query_builder.py
+
+import re
+
+from ourModules.translations import from_display_value, get_lookup_view
+from ourModules.fulltext import fulltext_predicate
+
+BUILDER_OPERATORS = ['=', '!=', '<', '>', '<=', '>=', 'LIKE', 'STARTS WITH', 'BETWEEN', 'IN', 'IS NULL', 'IS NOT NULL']
+NO_VALUE_OPERATORS = ('IS NULL', 'IS NOT NULL')
+COMPARISON_OPERATORS = ('=', '!=', '<', '>', '<=', '>=')
+
+def split_values(value: str) -> list:
+    """'Writer, Editor' -> ['Writer', 'Editor'] (the value format of IN and BETWEEN)."""
+    return [part.strip() for part in value.split(",") if part.strip()];
+
+def prefix_upper_bound(prefix: str):
+    """Smallest string greater than every string starting with `prefix` ('2023-05' -> '2023-06'), None if there is none."""
+    if not prefix or ord(prefix[-1]) >= 0x10FFFF:
+        return None;
+
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1);
+
+def is_numeric_type(declared_type: str) -> bool:
+    """Integer / real columns (declared type as in the schema cache, lower case)."""
+    return "int" in declared_type or any(t in declared_type for t in ("real", "floa", "doub", "num"));
+
+def has_text_affinity(declared_type: str) -> bool:
+    """
+    True if SQLite compares the column's values as they are stored (TEXT or BLOB affinity).
+    Any other type, `date` and `datetime` included, has NUMERIC affinity: a value such
+    as '2023' compared with it is first turned into the number 2023.
+    """
+    return declared_type == "" or any(t in declared_type for t in ("char", "clob", "text", "blob"));
+
+def prefix_predicate(col_name, declared_type, value: str):
+    """
+    `col_name` starts with `value`, as (sql, params). On text columns the range
+    "col" >= 'abc' AND "col" < 'abd', which a B-tree index on the column serves
+    (case-sensitive). On the others LIKE 'abc%', which reads the value as text:
+    the range would compare a NUMERIC affinity column (e.g. a `date` one, holding
+    text like '2023-05-01') with the number 2023 for '2023' and match nothing.
+    """
+    upper = prefix_upper_bound(value)
+    if upper is None or not has_text_affinity(declared_type):
+        return (f'"{col_name}" LIKE ?', (f'{value}%', ));
+
+    return (f'"{col_name}" >= ? AND "{col_name}" < ?', (value, upper));
+
+def compile_predicate(db_manager, table_name, col_name, operator, value):
+    """
+    One `col_name operator value` condition as (sql, params), with the value in
+    its display form (e.g. "Writer") translated to the raw one, and each
+    operator written so that SQLite can answer it from an index:
+
+        LIKE        full-text MATCH (fulltext_predicate), LIKE '%value%' without an FTS index
+        STARTS WITH range "col" >= 'value' AND "col" < 'valuf' on text columns (see prefix_predicate)
+        BETWEEN     'low, high'       IN  'a, b, c'       IS NULL / IS NOT NULL  no value
+
+    Display-mapped columns (specialisation, comments) match their labels through the lookup view.
+    Raises ValueError if the value does not fit the operator.
+    """
+    op = operator.upper()
+    quoted = f'"{col_name}"'
+
+    if op in NO_VALUE_OPERATORS:
+        return (f'{quoted} {op}', ());
+
+    if op in ("BETWEEN", "IN"):
+        values = [from_display_value(col_name, v) for v in split_values(value)]
+        if op == "BETWEEN" and len(values) != 2:
+            raise ValueError(f"BETWEEN needs two values separated by a comma, e.g. 2023-01-01, 2023-06-30 (got '{value}')")
+        if not values:
+            raise ValueError("IN needs at least one value, e.g. Writer, Editor")
+        if op == "BETWEEN":
+            return (f'{quoted} BETWEEN ? AND ?', tuple(values));
+
+        return (f'{quoted} IN ({", ".join("?" for _ in values)})', tuple(values));
+
+    if op in ("LIKE", "STARTS WITH"):
+        prefix = op == "STARTS WITH"
+        lookup_view = get_lookup_view(col_name)
+        if lookup_view is not None:
+            # Labels are matched in the (tiny) lookup view, the table is searched by raw key
+            pattern = f'{value}%' if prefix else f'%{value}%'
+            return (f'{quoted} IN (SELECT "id" FROM "{lookup_view}" WHERE "label" LIKE ?)', (pattern, ));
+
+        if prefix:
+            declared_type = db_manager.get_table_meta(table_name)["types"].get(col_name, "")
+            return prefix_predicate(col_name, declared_type, value);
+
+        predicate = fulltext_predicate(db_manager, table_name, col_name, value)
+        if predicate is not None:
+            return predicate;
+
+        return (f'{quoted} LIKE ?', (f'%{value}%', ));
+
+    if op in COMPARISON_OPERATORS:
+        return (f'{quoted} {op} ?', (from_display_value(col_name, value), ));
+
+    raise ValueError(f"Unknown operator '{operator}'. Choose one of: {', '.join(BUILDER_OPERATORS)}");
+
+class QueryBuilder:
+    """
+    Conditions of a multi-predicate search on one table, kept as OR-ed groups of
+    AND-ed conditions:
+
+        (order date BETWEEN 2023-01-01, 2023-06-30 AND quantity >= 10) OR (payment > 500)
+
+    compiled into one parameterised SELECT (see compile_predicate for the operators).
+    `explain()` previews the query plan and tells, condition by condition, whether
+    SQLite can use an index for it.
+    """
+    def __init__(self, db_manager, table_name):
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.groups = [[]] # [[(column, operator, value), ...], ...]
+
+        return;
+
+    def add(self, col_name, operator, value=""):
+        """Add a condition to the last group (AND). Raises ValueError for an invalid one."""
+        compile_predicate(self.db_manager, self.table_name, col_name, operator, value) # Validate now, not at search time
+        self.groups[-1].append((col_name, operator.upper(), "" if operator.upper() in NO_VALUE_OPERATORS else value))
+
+        return;
+
+    def new_group(self):
+        """The next conditions go to a new group, OR-ed with the previous ones."""
+        if self.groups[-1]:
+            self.groups.append([])
+
+        return;
+
+    def clear(self):
+        self.groups = [[]]
+
+        return;
+
+    def conditions(self):
+        return [condition for group in self.groups for condition in group];
+
+    def is_empty(self):
+        return not self.conditions();
+
+    @staticmethod
+    def describe_condition(condition):
+        (col_name, operator, value) = condition
+
+        return f"{col_name} {operator} {value}".strip();
+
+    def describe(self):
+        """Readable form of the conditions, e.g. (a = 1 AND b < 2) OR (c IS NULL)."""
+        groups = [group for group in self.groups if group]
+        texts = [" AND ".join(self.describe_condition(c) for c in group) for group in groups]
+        if len(texts) > 1:
+            texts = [f"({text})" for text in texts]
+
+        return " OR ".join(texts);
+
+    def where(self):
+        """(WHERE clause, params) of all the conditions."""
+        clauses = []
+        params = []
+        for group in self.groups:
+            if not group:
+                continue
+            compiled = [compile_predicate(self.db_manager, self.table_name, *condition) for condition in group]
+            clauses.append(" AND ".join(f"({sql})" for (sql, _) in compiled))
+            for (_, condition_params) in compiled:
+                params.extend(condition_params)
+
+        if len(clauses) > 1:
+            clauses = [f"({clause})" for clause in clauses]
+
+        return (" OR ".join(clauses) or "1", tuple(params));
+
+    def query(self):
+        """(SELECT, params) of the search."""
+        (where_clause, params) = self.where()
+
+        return (f'SELECT * FROM "{self.table_name}" WHERE {where_clause}', params);
+
+    def _plan(self, query, params, conn=None):
+        # EXPLAIN QUERY PLAN -> (id, parent, notused, detail)
+        return [row[3] for row in self.db_manager.fetchall(f"EXPLAIN QUERY PLAN {query}", params, conn=conn)];
+
+    def explain(self, conn=None):
+        """
+        Query plan preview, without running the search:
+        {"plan": detail lines of the whole query,
+         "conditions": [(condition text, uses an index, plan line of the table), ...]}
+        """
+        (query, params) = self.query()
+        access = re.compile(rf'^(SCAN|SEARCH) "?{re.escape(self.table_name)}"?\b')
+
+        conditions = []
+        for condition in self.conditions():
+            (sql, condition_params) = compile_predicate(self.db_manager, self.table_name, *condition)
+            plan = self._plan(f'SELECT * FROM "{self.table_name}" WHERE {sql}', condition_params, conn)
+            line = next((detail for detail in plan if access.match(detail)), plan[0] if plan else "")
+            conditions.append((self.describe_condition(condition), line.startswith("SEARCH"), line))
+
+        return {"plan": self._plan(query, params, conn), "conditions": conditions};
+
+def main():
+    """Demo, run from ourAPP/: python -m ourModules.query_builder DB"""
+    import sys
+    from ourModules.database_manager import DatabaseManager
+
+    db_manager = DatabaseManager(sys.argv[1] if len(sys.argv) > 1 else "publishing_house.db")
+    builder = QueryBuilder(db_manager, "client_orders")
+    builder.add("order date", "STARTS WITH", "2023-05")
+    builder.add("quantity", ">=", "10")
+    builder.new_group()
+    builder.add("payment", "IS NULL")
+
+    print(builder.describe())
+    print(builder.query())
+    preview = builder.explain()
+    for (text, indexed, line) in preview["conditions"]:
+        print(f"  {'index' if indexed else 'SCAN ':<5} | {text:<35} | {line}")
+    print("\n".join(preview["plan"]))
+    db_manager.close_connection()
+
+    return;
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# ourModules/query_executor.py
+
+import queue
+import sqlite3
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+class QueryTask:
+    """
+    Handle of one job submitted to the QueryExecutor.
+    Wraps the concurrent.futures.Future of the job and knows how to cancel it,
+    even while its SQL is already running (through Connection.interrupt()).
+    """
+    def __init__(self, executor, on_done=None, on_error=None, on_progress=None):
+        self.future = None # Set by QueryExecutor.submit
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+
+        self.cancel_event = threading.Event() # Also usable as iter_chunks(cancel_event=...)
+        self._executor = executor
+        self._conn = None                     # Connection of the worker while the job runs
+        self._lock = threading.Lock()
+
+        return;
+
+    def cancel(self):
+        """Cancel the job: drop it if still queued, interrupt its SQL if running."""
+        self.cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self._executor._tasks.discard(self) # Never started, nothing will be posted
+            return;
+
+        with self._lock:
+            if self._conn is not None:
+                self._conn.interrupt() # The running statement fails with "interrupted"
+
+        return;
+
+    def cancelled(self):
+        return self.cancel_event.is_set();
+
+    def report(self, value):
+        """
+        Called by the job (worker thread) to hand a partial result to Tk,
+        e.g. a chunk of rows. Delivered to `on_progress` on the Tk thread.
+        """
+        if self.on_progress is not None and not self.cancelled():
+            self._executor._post(self, self.on_progress, value)
+
+        return;
+
+    def _attach(self, conn):
+        with self._lock:
+            self._conn = conn
+
+        return;
+
+class QueryExecutor:
+    """
+    Runs database work off the Tk thread.
+
+    Jobs run on a small thread pool, each on its own pooled connection of the
+    DatabaseManager (by default a read-only snapshot, see
+    DatabaseManager.snapshot()), and `submit()` returns a QueryTask (with the Future in
+    `task.future`). Results, errors and progress reports are not delivered from the
+    worker threads: they are put on a queue which the Tk thread polls with `after()`,
+    so callbacks may freely touch widgets.
+    """
+    def __init__(self, tk_root, db_manager, workers=2, poll_interval=30):
+        self.tk_root = tk_root
+        self.db_manager = db_manager
+        self.poll_interval = poll_interval # Milliseconds between two queue polls
+
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query")
+        self._results = queue.SimpleQueue() # (task, callback, value, final) for the Tk thread
+        self._tasks = set()                 # Tasks not finished yet (to cancel on shutdown)
+        self._after_id = self.tk_root.after(self.poll_interval, self._poll)
+
+        return;
+
+    def submit(self, job, on_done=None, on_error=None, on_progress=None, read_only=True, tag=None):
+        """
+        Run `job(conn, task)` on a worker thread and return its QueryTask.
+
+        `on_done(result)`, `on_error(exception)` and `on_progress(value)` are
+        called on the Tk thread. Nothing is delivered for a cancelled task.
+        Jobs are read-only unless `read_only=False` is given: they then get a
+        read-write connection instead of a snapshot. `tag` labels the job's
+        statements in the query statistics (see DatabaseManager.tag).
+        """
+        task = QueryTask(self, on_done, on_error, on_progress)
+        self._tasks.add(task)
+        task.future = self._pool.submit(self._run, task, job, read_only, tag)
+
+        return task;
+
+    def submit_query(self, query, params=None, on_done=None, on_error=None, tag=None):
+        """Convenience wrapper: run one SELECT in the background, `on_done(rows)` gets all rows."""
+        def job(conn, task):
+            rows = []
+            for chunk in self.db_manager.iter_chunks(query, params, cancel_event=task.cancel_event, conn=conn):
+                rows.extend(chunk)
+            return rows;
+
+        return self.submit(job, on_done=on_done, on_error=on_error, tag=tag);
+
+    def _run(self, task, job, read_only, tag):
+        """Worker thread body: check out a connection, run the job, queue the outcome."""
+        if task.cancelled():
+            self._post(task, None, None)
+            return;
+
+        if read_only:
+            checkout = self.db_manager.snapshot()
+        else:
+            checkout = self.db_manager.connection()
+
+        try:
+            with checkout as conn, self.db_manager.tag(tag):
+                task._attach(conn)
+                try:
+                    result = job(conn, task)
+                finally:
+                    task._attach(None)
+                    self.db_manager.release_thread_connection() # Taken by get_connection() during the job, if any
+        except Exception as e:
+            if isinstance(e, sqlite3.OperationalError) and task.cancelled():
+                self._post(task, None, None) # Interrupted on purpose, nothing to report
+            else:
+                self._post(task, task.on_error, e, final=True)
+            return;
+
+        self._post(task, task.on_done, result, final=True)
+
+        return;
+
+    def _post(self, task, callback, value, final=False):
+        self._results.put((task, callback, value, final))
+
+        return;
+
+    def _poll(self):
+        """Tk thread: deliver everything the workers queued, then re-arm the timer."""
+        while True:
+            try:
+                task, callback, value, final = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if final or callback is None:
+                self._tasks.discard(task)
+            if callback is None or task.cancelled():
+                continue
+
+            try:
+                callback(value)
+            except Exception:
+                traceback.print_exc() # A failing callback (e.g. destroyed widget) must not stop polling
+
+        self._after_id = self.tk_root.after(self.poll_interval, self._poll)
+
+        return;
+
+    def shutdown(self):
+        """Cancel every pending/running task and stop the worker threads."""
+        for task in list(self._tasks):
+            task.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+        if self._after_id is not None:
+            self.tk_root.after_cancel(self._after_id)
+            self._after_id = None
+
+        return;
@@ -0,0 +1,184 @@
+# ourModules/query_stats.py
+
+import re
+import time
+import logging
+import threading
+from logging.handlers import RotatingFileHandler
+
+# Upper bounds (milliseconds) of the latency histogram buckets; the last one catches everything else
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, float("inf"))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?(?![\w\"])")
+_IN_LIST        = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE     = re.compile(r"\s+")
+
+def normalize_sql(sql: str) -> str:
+    """
+    Reduce a statement to its "shape": literals become ?, IN lists collapse
+    to (?...) and whitespace is squashed, so that the same query with
+    different values lands in the same histogram.
+    """
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("(?...)", shape)
+    shape = _WHITESPACE.sub(" ", shape).strip().rstrip(";")
+
+    return shape;
+
+class QueryStats:
+    """
+    In-memory latency statistics of every statement run through the
+    DatabaseManager, grouped by (source tag, statement shape), plus a rotating
+    slow-query log with the EXPLAIN QUERY PLAN of each slow statement.
+    Failed statements (constraint errors, interrupted searches) are counted
+    too, with the time they took before failing.
+
+    Not recorded: the statements the DatabaseManager runs for itself (BEGIN /
+    COMMIT / SAVEPOINT, the PRAGMAs set when a connection opens, the
+    schema_version and data_version probes), executescript() calls such as the
+    schema update of fulltext.rebuild_fulltext, and anything run straight on a
+    sqlite3 connection instead of through the manager.
+    """
+    def __init__(self, slow_threshold_ms=200, log_path=None, max_bytes=1_000_000, backup_count=3):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.log_path = log_path
+
+        self._entries = {} # (tag, shape) -> dict, see record()
+        self._lock = threading.Lock()
+
+        self._logger = None
+        if log_path is not None:
+            self._logger = logging.getLogger(f"publishing_house.slow_queries.{id(self)}")
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self._logger.addHandler(handler)
+
+        return;
+
+    def is_slow(self, elapsed):
+        """True if `elapsed` (seconds) is over the slow-query threshold."""
+        return elapsed * 1000 >= self.slow_threshold_ms;
+
+    def record(self, sql, n_params, n_rows, elapsed, tag=None, statements=1, plan=None, error=None):
+        """
+        Account one statement.
+
+        :param n_params:   number of bound parameters (per execution)
+        :param n_rows:     rows returned or affected
+        :param elapsed:    wall-clock seconds spent in SQLite
+        :param tag:        which part of the GUI ran it, e.g. "Tab: PARTNER"
+        :param statements: statements SQLite actually executed for it (trace callback),
+                           more than 1 for executemany() or when triggers / cascades fire
+        :param plan:       EXPLAIN QUERY PLAN lines, written to the slow-query log
+        :param error:      the exception the statement failed with, None if it succeeded
+        """
+        shape = normalize_sql(sql)
+        elapsed_ms = elapsed * 1000
+        key = (tag or "-", shape)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    "tag":        key[0],
+                    "shape":      shape,
+                    "count":      0,
+                    "statements": 0,
+                    "rows":       0,
+                    "params":     n_params,
+                    "total_ms":   0.0,
+                    "max_ms":     0.0,
+                    "buckets":    [0] * len(LATENCY_BUCKETS_MS),
+                    "slow":       0,
+                    "errors":     0,
+                }
+            entry["count"] += 1
+            entry["statements"] += statements
+            entry["rows"] += max(n_rows, 0)
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            for i, bound in enumerate(LATENCY_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    entry["buckets"][i] += 1
+                    break
+            if self.is_slow(elapsed):
+                entry["slow"] += 1
+            if error is not None:
+                entry["errors"] += 1
+
+        if self.is_slow(elapsed) and self._logger is not None:
+            plan_text = "\n".join(f"    {line}" for line in (plan or ["(no plan)"]))
+            failed = f" | FAILED: {error}" if error is not None else ""
+            self._logger.info(
+                f"{elapsed_ms:.1f} ms | {key[0]} | {n_params} params | {n_rows} rows | "
+                f"{statements} statements{failed}\n  {shape}\n{plan_text}"
+            )
+
+        return;
+
+    @staticmethod
+    def percentile(entry, fraction):
+        """Approximate latency percentile (upper bucket bound, ms) of an entry."""
+        target = entry["count"] * fraction
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS_MS, entry["buckets"]):
+            seen += n
+            if seen >= target and n:
+                return min(bound, entry["max_ms"]);
+
+        return entry["max_ms"];
+
+    def entries(self):
+        """Copies of all entries, most expensive (total time) first."""
+        with self._lock:
+            entries = [dict(e, buckets=list(e["buckets"])) for e in self._entries.values()]
+
+        return sorted(entries, key=lambda e: e["total_ms"], reverse=True);
+
+    def totals_by_tag(self):
+        """{tag: (statement count, total ms)} - which tab / chart / window is burning time."""
+        totals = {}
+        for entry in self.entries():
+            count, total = totals.get(entry["tag"], (0, 0.0))
+            totals[entry["tag"]] = (count + entry["count"], total + entry["total_ms"])
+
+        return totals;
+
+    def reset(self):
+        with self._lock:
+            self._entries = {}
+
+        return;
+
+    def report(self, limit=20):
+        """Plain-text summary (one line per statement shape)."""
+        lines = [f"{'source':<28} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>9} {'total ms':>10}  statement"]
+        for entry in self.entries()[:limit]:
+            lines.append(
+                f"{entry['tag'][:28]:<28} {entry['count']:>7} "
+                f"{self.percentile(entry, 0.5):>8.1f} {self.percentile(entry, 0.95):>8.1f} "
+                f"{entry['max_ms']:>9.1f} {entry['total_ms']:>10.1f}  {entry['shape'][:120]}"
+            )
+
+        return "\n".join(lines);
+
+class Stopwatch:
+    """Accumulates wall-clock time over several start/stop laps (e.g. fetchmany calls)."""
+    def __init__(self):
+        self.elapsed = 0.0
+        self._started = None
+
+        return;
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self;
+
+    def __exit__(self, *exc):
+        self.elapsed += time.perf_counter() - self._started
+        self._started = None
+        return False;
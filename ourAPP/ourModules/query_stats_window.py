@@ -0,0 +1,92 @@
+# ourModules/query_stats_window.py
+
+import tkinter as tk
+from tkinter import ttk
+
+class QueryStatsWindow(tk.Toplevel):
+    """
+    Shows the QueryStats collected by the DatabaseManager:
+    one row per (source, statement shape), most expensive first.
+    """
+    COLUMNS = ("source", "count", "p50 ms", "p95 ms", "max ms", "total ms", "rows", "statements", "slow", "errors", "statement")
+
+    def __init__(self, parent, query_stats):
+        super().__init__(parent)
+
+        self.title("Query Statistics")
+        self.query_stats = query_stats
+
+        container = ttk.Frame(self, padding=10)
+        container.pack(expand=True, fill='both')
+
+        lbl_title = ttk.Label(container, text="- Query Latency -", font=('Arial', 14, 'bold'))
+        lbl_title.pack(pady=5)
+
+        btn_frame = ttk.Frame(container)
+        btn_frame.pack(pady=5)
+
+        btn_refresh = ttk.Button(btn_frame, text="Refresh", command=self.refresh)
+        btn_refresh.pack(side="left", padx=5)
+
+        btn_reset = ttk.Button(btn_frame, text="Reset", command=self.reset)
+        btn_reset.pack(side="left", padx=5)
+
+        # Totals per source (tab / window / chart)
+        self.lbl_sources = ttk.Label(container, text="", justify='left')
+        self.lbl_sources.pack(fill='x', pady=5)
+
+        # ------------ Treeview with one row per statement shape ------------
+        tree_frame = ttk.Frame(container)
+        tree_frame.pack(expand=True, fill='both', pady=5)
+
+        scroll_y = ttk.Scrollbar(tree_frame, orient="vertical")
+        scroll_y.pack(side="right", fill="y")
+
+        self.tree = ttk.Treeview(tree_frame, columns=self.COLUMNS, show='headings', yscrollcommand=scroll_y.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scroll_y.config(command=self.tree.yview)
+
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=80, anchor='center')
+        self.tree.column("source", width=180, anchor='w')
+        self.tree.column("statement", width=600, anchor='w')
+
+        log_text = f"Slow queries (>= {self.query_stats.slow_threshold_ms} ms) are logged to: {self.query_stats.log_path}"
+        ttk.Label(container, text=log_text).pack(fill='x', pady=5)
+
+        self.refresh()
+
+        return;
+
+    def refresh(self):
+        """Reload the statistics from the QueryStats object."""
+        self.tree.delete(*self.tree.get_children())
+
+        for entry in self.query_stats.entries():
+            self.tree.insert("", "end", values=(
+                entry["tag"],
+                entry["count"],
+                f"{self.query_stats.percentile(entry, 0.5):.1f}",
+                f"{self.query_stats.percentile(entry, 0.95):.1f}",
+                f"{entry['max_ms']:.1f}",
+                f"{entry['total_ms']:.1f}",
+                entry["rows"],
+                entry["statements"],
+                entry["slow"],
+                entry["errors"],
+                entry["shape"],
+            ))
+
+        totals = sorted(self.query_stats.totals_by_tag().items(), key=lambda item: item[1][1], reverse=True)
+        self.lbl_sources.config(text="   ".join(
+            f"{tag}: {total:.0f} ms / {count}" for tag, (count, total) in totals[:8]
+        ))
+
+        return;
+
+    def reset(self):
+        self.query_stats.reset()
+        self.refresh()
+
+        return;
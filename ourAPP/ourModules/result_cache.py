@@ -0,0 +1,97 @@
+# ourModules/result_cache.py
+
+import sys
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+def estimate_size(value) -> int:
+    """Rough memory footprint (bytes) of a value made of dicts / lists / tuples of plain values."""
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value);
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values());
+
+    return sys.getsizeof(value);
+
+class ResultCache:
+    """
+    LRU cache of search results, capped at `max_bytes` (estimated, see estimate_size).
+
+    The key is chosen by the caller and must change whenever the result may:
+    SearchWindow uses (table, query, params, DatabaseManager.table_version(table),
+    DatabaseManager.data_version()), so a write through the application or a commit
+    from another connection makes the old entries unreachable; they then age out.
+    Used from the Tk thread only.
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0     # Estimated bytes of all entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() # key -> (value, size), least recently used first
+
+        return;
+
+    def get(self, key, default=None):
+        """Cached value of `key` (now the most recently used), `default` on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default;
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return entry[0];
+
+    def put(self, key, value, size=None):
+        """
+        Cache `value`; `size` (bytes) is estimated if not given. A value larger
+        than the whole cache is not stored. Least recently used entries make room.
+        """
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return;
+
+        self.discard(key)
+        while self._entries and self.size + size > self.max_bytes:
+            (_, (_, old_size)) = self._entries.popitem(last=False)
+            self.size -= old_size
+        self._entries[key] = (value, size)
+        self.size += size
+
+        return;
+
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+        return;
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+        return;
+
+    def __len__(self):
+        return len(self._entries);
+
+    def stats_text(self):
+        """For the metadata bar, e.g. 'Cache: 12 hits / 5 misses (1.3 MB)'."""
+        return f"Cache: {self.hits} hits / {self.misses} misses ({self.size / (1024 * 1024):.1f} MB)";
+
+def main():
+    cache = ResultCache(max_bytes=2000)
+    cache.put("a", [(1, ["x"])])
+    cache.put("b", [(2, ["y" * 500])])
+    print(cache.get("a"), cache.get("missing"), len(cache), cache.stats_text())
+    cache.put("c", [(3, ["z" * 1500])]) # Evicts the least recently used entry ("b")
+    print(cache.get("b"), cache.get("a"), len(cache), cache.stats_text())
+
+    return;
+
+if __name__ == "__main__":
+    main()
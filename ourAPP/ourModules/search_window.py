@@ -4,15 +4,32 @@ from time import perf_counter
 from difflib import get_close_matches
 import tkinter as tk
 from tkinter import ttk, messagebox
-from ourModules.translations import from_display_value, to_display_value, table_to_display, table_from_display
+from ourModules.keyset_pager import key_to_iid, iid_to_key
+from ourModules.exporter import QueryExporter, export_with_progress
+from ourModules.fulltext import suggest_value
+from ourModules.query_builder import BUILDER_OPERATORS, QueryBuilder, compile_predicate
+from ourModules.global_search_window import GlobalSearchWindow
+from ourModules.result_cache import ResultCache, estimate_size
+from ourModules.translations import get_lookup_view, compile_row_to_display, table_to_display, table_from_display
 # ourModules.translations.py, επειδή το θέλει βάση το που είναι το αρχείο από την θέση της main.py
 
+TYPING_DELAY_MS = 300 # Search-as-you-type starts once the user pauses this long
+FIRST_HITS = 50       # Rows of the first chunk, shown before the rest of the result is read
+
 class SearchWindow(tk.Toplevel):
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, query_executor, result_cache=None):
         super().__init__(parent)
         
         self.title("🔎")
         self.db_manager = db_manager
+        self.query_executor = query_executor # Searches run off the Tk thread
+        self.search_task = None              # QueryTask of the running search
+        self.results_table = None            # Table of the rows in results_tree
+        self.results_query = None            # (sql, params) of the rows in results_tree, for Export
+        self.typing_job = None               # after() id of the pending search-as-you-type
+        self.searched_value = None           # Value of the last search (keys that do not edit it are ignored)
+        self.builder = None                  # QueryBuilder of the selected table (several conditions)
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
         
         # ------------ Container frame ------------
         container = ttk.Frame(self, padding=10)
@@ -56,8 +73,7 @@ class SearchWindow(tk.Toplevel):
         lbl_op.grid(row=2, column=0, padx=5, pady=5)
         
         self.op_var = tk.StringVar(value='LIKE')
-        operators = ['=', 'LIKE', '<', '>', '<=', '>=']
-        self.cmb_op = ttk.Combobox(controls_frame, textvariable=self.op_var, values=operators, state='readonly')
+        self.cmb_op = ttk.Combobox(controls_frame, textvariable=self.op_var, values=BUILDER_OPERATORS, state='readonly')
         self.cmb_op.grid(row=2, column=1, padx=5, pady=5)
         
         # ------------ Value ------------
@@ -67,6 +83,8 @@ class SearchWindow(tk.Toplevel):
         self.value_var = tk.StringVar()
         self.ent_value = ttk.Entry(controls_frame, textvariable=self.value_var)
         self.ent_value.grid(row=3, column=1, padx=5, pady=5)
+        self.ent_value.bind("<KeyRelease>", self.on_value_typed)
+        self.ent_value.bind("<Return>", lambda event: self.run_search())
         
         # Edit button - Transfer Data in main window
         btn_select = ttk.Button(controls_frame, text="Edit selected", command=self.select_for_editing)
@@ -75,6 +93,27 @@ class SearchWindow(tk.Toplevel):
         # ------------ Search button ------------
         btn_search = ttk.Button(controls_frame, text="Search", command=self.run_search)
         btn_search.grid(row=4, column=1, columnspan=1, pady=5)
+
+        # The value in every table and column at once (table / column / operator are ignored)
+        btn_everywhere = ttk.Button(controls_frame, text="Search Everywhere", command=self.search_everywhere)
+        btn_everywhere.grid(row=5, column=0, columnspan=2, pady=5)
+        
+        # ------------ Query builder: several conditions in one query ------------
+        builder_frame = ttk.LabelFrame(container, text="Conditions", padding=5)
+        builder_frame.pack(fill='x', pady=5)
+
+        btn_add = ttk.Button(builder_frame, text="Add (AND)", command=self.add_condition)
+        btn_add.grid(row=0, column=0, padx=5)
+        btn_or = ttk.Button(builder_frame, text="New OR group", command=self.new_condition_group)
+        btn_or.grid(row=0, column=1, padx=5)
+        btn_clear = ttk.Button(builder_frame, text="Clear", command=self.clear_conditions)
+        btn_clear.grid(row=0, column=2, padx=5)
+        btn_plan = ttk.Button(builder_frame, text="Query Plan…", command=self.show_query_plan)
+        btn_plan.grid(row=0, column=3, padx=5)
+
+        self.lbl_conditions = ttk.Label(builder_frame, wraplength=520, justify='left')
+        self.lbl_conditions.grid(row=1, column=0, columnspan=4, sticky='w', padx=5, pady=(5, 0))
+        self.update_conditions_label()
         
         # ------------ Treeview for results ------------
         self.tree_frame = ttk.Frame(container)
@@ -95,10 +134,31 @@ class SearchWindow(tk.Toplevel):
         self.lbl_time = ttk.Label(self.metadata_frame, text="Time Elapsed: ~ seconds")
         self.lbl_time.pack(side='left', padx=10)
 
+        # Label for the result cache hits / misses
+        self.lbl_cache = ttk.Label(self.metadata_frame, text=self.result_cache.stats_text())
+        self.lbl_cache.pack(side='left', padx=10)
+
         # Label for result count
         self.lbl_count = ttk.Label(self.metadata_frame, text="Results Found: ~")
         self.lbl_count.pack(side='left', padx=10)
 
+        btn_export = ttk.Button(self.metadata_frame, text="Export Results…", command=self.export_results)
+        btn_export.pack(side='right', padx=10)
+
+        self.bind("<Destroy>", self.on_destroy)
+
+        return;
+
+    def on_destroy(self, event):
+        """Cancel a running search when the window closes."""
+        if event.widget is not self:
+            return;
+
+        if self.typing_job is not None:
+            self.after_cancel(self.typing_job)
+        if self.search_task is not None:
+            self.search_task.cancel()
+
         return;
 
     def bring_to_front(self):
@@ -115,16 +175,124 @@ class SearchWindow(tk.Toplevel):
         user_friendly_name = self.table_var.get()
         actual_table_name = table_from_display(user_friendly_name)
 
-        columns_info = self.db_manager.get_table_columns(actual_table_name)
-        col_names = [col[1] for col in columns_info]
+        col_names = self.db_manager.get_table_meta(actual_table_name)["col_names"]
         self.cmb_column['values'] = col_names
         if col_names:
             self.cmb_column.current(0)
+
+        # Conditions belong to one table
+        self.builder = QueryBuilder(self.db_manager, actual_table_name)
+        self.update_conditions_label()
         
         return;
+
+    # ------------------- Query builder -------------------
+    def update_conditions_label(self):
+        if self.builder is None or self.builder.is_empty():
+            self.lbl_conditions.config(text="No conditions: Search uses the fields above.")
+        else:
+            self.lbl_conditions.config(text=f"WHERE {self.builder.describe()}")
+
+        return;
+
+    def add_condition(self):
+        """Add the column / operator / value above to the conditions (AND-ed with its group)."""
+        if self.builder is None or not self.column_var.get():
+            messagebox.showwarning("Warning", "Please select a table and column.", parent=self)
+            self.bring_to_front() # After a message box is dismissed
+
+            return;
+
+        try:
+            self.builder.add(self.column_var.get(), self.op_var.get(), self.value_var.get().strip())
+        except ValueError as e:
+            messagebox.showwarning("Invalid condition", str(e), parent=self)
+            self.bring_to_front() # After a message box is dismissed
+
+            return;
+
+        self.update_conditions_label()
+
+        return;
+
+    def new_condition_group(self):
+        """The next conditions form a new group, OR-ed with the others."""
+        if self.builder is not None:
+            self.builder.new_group()
+
+        return;
+
+    def clear_conditions(self):
+        if self.builder is not None:
+            self.builder.clear()
+        self.update_conditions_label()
+
+        return;
+
+    def show_query_plan(self):
+        """EXPLAIN QUERY PLAN of the conditions (or of the fields above): which of them can use an index."""
+        if self.builder is None:
+            messagebox.showwarning("Warning", "Please select a table and column.", parent=self)
+            self.bring_to_front() # After a message box is dismissed
+
+            return;
+
+        builder = self.builder
+        if builder.is_empty():
+            builder = QueryBuilder(self.db_manager, self.builder.table_name)
+            try:
+                builder.add(self.column_var.get(), self.op_var.get(), self.value_var.get().strip())
+            except ValueError as e:
+                messagebox.showwarning("Invalid condition", str(e), parent=self)
+                self.bring_to_front() # After a message box is dismissed
+
+                return;
+
+        def on_done(preview):
+            lines = [
+                f"{'✔ index' if indexed else '✘ scan'}   {text}\n            {detail}"
+                for (text, indexed, detail) in preview["conditions"]
+            ]
+            lines.append("\nWhole query:")
+            lines.extend(f"    {detail}" for detail in preview["plan"])
+            messagebox.showinfo("Query Plan", "\n".join(lines), parent=self)
+            self.bring_to_front() # After a message box is dismissed
+
+            return;
+
+        def on_error(e):
+            messagebox.showerror("Error", f"Could not explain the query:\n{e}", parent=self)
+            self.bring_to_front() # After a message box is dismissed
+
+            return;
+
+        self.query_executor.submit(
+            lambda conn, task: builder.explain(conn), on_done=on_done, on_error=on_error,
+            tag=f"Query plan: {builder.table_name}"
+        )
+
+        return;
     
-    def run_search(self, suggested_value=None):
-        """Build a SELECT query based on the user's inputs."""
+    def on_value_typed(self, event):
+        """Search as you type: (re)start the TYPING_DELAY_MS countdown on every edit of the value."""
+        if event.keysym == "Return" or self.value_var.get().strip() == self.searched_value:
+            return; # Enter searches at once; arrows, shift, ... do not change the value
+
+        if self.typing_job is not None:
+            self.after_cancel(self.typing_job)
+        self.typing_job = self.after(TYPING_DELAY_MS, lambda: self.run_search(live=True))
+
+        return;
+
+    def run_search(self, suggested_value=None, live=False):
+        """
+        Build a SELECT query based on the user's inputs.
+        `live` searches (search as you type) stay quiet: no message boxes, no "Did you mean".
+        """
+        if self.typing_job is not None:
+            self.after_cancel(self.typing_job) # This search replaces the pending one
+            self.typing_job = None
+
         # Convert the selected table from friendly name to actual DB name
         table_friendly = self.table_var.get()
         table = table_from_display(table_friendly)
@@ -134,75 +302,181 @@ class SearchWindow(tk.Toplevel):
         value = suggested_value if suggested_value is not None \
             else self.value_var.get().strip()
         
+        # Search uses the conditions of the query builder, if there are any
+        use_builder = suggested_value is None and self.builder is not None \
+            and self.builder.table_name == table and not self.builder.is_empty()
+        
+        self.searched_value = value
+        if live and (not table or not column or not value or use_builder):
+            return; # Nothing to search yet (an empty value would list the whole table)
+
         if not table or not column:
             messagebox.showwarning("Warning", "Please select a table and column.", parent=self)
             self.bring_to_front() # After a message box is dismissed
 
             return;
         
-        if operator.upper() == "LIKE":
-            where_clause = f'"{column}" LIKE ?'
-            params = (f'%{value}%', )
-        else:
-            where_clause = f'"{column}" {operator} ?'
-            params = (value, )
+        # One parameterised query, each condition in its index-friendly form (see compile_predicate),
+        # with display labels ("Writer") translated to the raw keys the table stores
+        try:
+            if use_builder:
+                (query, params) = self.builder.query()
+            else:
+                (where_clause, params) = compile_predicate(self.db_manager, table, column, operator, value)
+                query = f'SELECT * FROM "{table}" WHERE {where_clause}'
+        except ValueError as e:
+            if not live:
+                messagebox.showwarning("Invalid condition", str(e), parent=self)
+                self.bring_to_front() # After a message box is dismissed
+
+            return;
         
-        query = f'SELECT * FROM "{table}" WHERE {where_clause}'
+        lookup_view = get_lookup_view(column)
+        # "Did you mean" only makes sense for a single value compared as a whole
+        suggest = not live and not use_builder and operator.upper() in ("=", "LIKE", "STARTS WITH")
         
-        try:
-            start_time =   perf_counter() # Start timing
-            rows_raw =     self.db_manager.fetchall(query, params)
-            end_time =     perf_counter() # Stop timing
-            elapsed_time = end_time - start_time
+        col_names = self.db_manager.get_table_meta(table)["col_names"]
+        pk_idx = [col_names.index(col) for col in self.db_manager.get_primary_key(table)]
+        row_to_display = compile_row_to_display(col_names)
+        
+        if self.search_task is not None:
+            self.search_task.cancel() # Only the latest search may fill the results: a running one is interrupted
+        self.results_query = (query, params)
+        start_time = perf_counter() # Start timing
+        
+        # The same query on unchanged data is answered from memory: any write to the table
+        # (table_version) or commit by another connection (data_version) changes the key
+        cache_key = (table, query, params, self.db_manager.table_version(table), self.db_manager.data_version())
+        cached = self.result_cache.get(cache_key)
+        self.lbl_cache.config(text=self.result_cache.stats_text())
+        if cached is not None:
+            self.search_task = None
+            n_rows = self.display_results(cached["rows"], table)
+            self.finish_search(value, n_rows, None if live else cached["suggested"], perf_counter() - start_time, cached=True)
             
-            # Convert raw rows to display-friendly rows
-            rows = [
-                tuple(
-                    to_display_value(col_name, r)
-                    for col_name, r in zip(self.cmb_column['values'], row)
-                )
-                for row in rows_raw
-            ]
-            self.display_results(rows, table) # Display the results in the Treeview
+            return;
+        
+        self.display_results([], table) # Clear the Treeview and set up its columns
+        max_bytes = self.result_cache.max_bytes
+        
+        def job(conn, task):
+            """Runs on a worker thread: stream the rows, then look for a suggestion."""
+            n_rows = 0
+            collected = [] # The rows again, for the result cache (None once too big to cache)
+            size = 0
+            for chunk in self.db_manager.iter_chunks(
+                query, params, cancel_event=task.cancel_event, conn=conn, first_chunk_size=FIRST_HITS
+            ):
+                # Convert raw rows to (primary key, display-friendly row) pairs
+                pairs = [
+                    (tuple(row[i] for i in pk_idx), row_to_display(row))
+                    for row in chunk
+                ]
+                task.report(pairs)
+                n_rows += len(chunk)
+                if collected is not None:
+                    size += estimate_size(pairs)
+                    if size <= max_bytes:
+                        collected.extend(pairs)
+                    else:
+                        collected = None
             
-            # Update the elapsed time and result count labels
-            self.lbl_time.config(text=f"Time Elapsed: {elapsed_time:.4f} seconds")
-            self.lbl_count.config(text=f"Results Found: {len(rows)}")
-
             # Suggestion logic
-            if len(rows) == 0 and suggested_value is None:
-                # Fetch all existing items from the database using fetchall directly
-                get_everything_query = f'SELECT "{column}" FROM "{table}"'
-                everything_raw = self.db_manager.fetchall(get_everything_query)
-                everything = [str(row[0]) for row in everything_raw if row[0] is not None]
-                # str(), αλλιώς TypeError: object of type 'int' has no len()!
-                
-                # Use difflib to find close matches with a cutoff for similarity
-                suggestions = get_close_matches(value, everything, n=1, cutoff=0.8)
+            suggested = None
+            if not suggest:
+                pass # Not while typing (the value is probably not finished), nor for several conditions
+            elif n_rows == 0 and suggested_value is None and lookup_view is not None:
+                # A handful of labels (e.g. "Writer"): compare with all of them
+                labels = [row[0] for row in self.db_manager.iter_query(f'SELECT "label" FROM "{lookup_view}"', conn=conn)]
+                suggestions = get_close_matches(value, labels, n=1, cutoff=0.8)
                 if suggestions:
                     suggested = suggestions[0]
-                    message = f"No results found for '{value}'.\n - - -> Did you mean: '{suggested}'?"
-                    response = messagebox.askyesno("Suggestion", message, parent=self)
-                    self.bring_to_front() # After a message box is dismissed
-                    if response:
-                        # If user agrees, perform the search with the suggested value
-                        self.value_var.set(suggested)
-                        self.run_search(suggested_value=suggested)
-        except Exception as e:
+            elif n_rows == 0 and suggested_value is None:
+                # Candidates from the trigram (full-text) index, never the whole column
+                suggested = suggest_value(self.db_manager, table, column, value, conn=conn)
+            
+            return (n_rows, suggested, collected, size);
+        
+        def on_done(result):
+            (n_rows, suggested, collected, size) = result
+            # An empty result is only kept if its "Did you mean" was looked for (not while typing)
+            if collected is not None and (n_rows > 0 or suggest):
+                self.result_cache.put(cache_key, {"rows": collected, "suggested": suggested}, size)
+            self.finish_search(value, n_rows, suggested, perf_counter() - start_time)
+            
+            return;
+        
+        shown = 0
+        
+        def on_progress(rows):
+            # Rows arrive chunk by chunk, the first FIRST_HITS right away
+            nonlocal shown
+            shown += self.append_results(rows)
+            self.lbl_count.config(text=f"Results Found: {shown}…")
+            
+            return;
+        
+        def on_error(e):
+            if live:
+                # No message box on every keystroke: the status label says it
+                self.lbl_count.config(text=f"Search failed: {e}")
+                
+                return;
+            
             messagebox.showerror("Error", f"Search failed:\n{e}", parent=self)
             self.bring_to_front() # After a message box is dismissed
+            
+            return;
+        
+        self.lbl_count.config(text="Results Found: …")
+        self.search_task = self.query_executor.submit(
+            job, on_done=on_done, on_error=on_error, on_progress=on_progress,
+            tag=f"Search: {table}"
+        )
 
         return;
     
+    def finish_search(self, value, n_rows, suggested, elapsed_time, cached=False):
+        """Show the time / count / cache labels of a finished search and offer its suggestion, if any."""
+        # Update the elapsed time and result count labels
+        self.lbl_time.config(text=f"Time Elapsed: {elapsed_time:.4f} seconds{' (cached)' if cached else ''}")
+        self.lbl_count.config(text=f"Results Found: {n_rows}")
+        self.lbl_cache.config(text=self.result_cache.stats_text())
+        
+        if suggested is not None:
+            message = f"No results found for '{value}'.\n - - -> Did you mean: '{suggested}'?"
+            response = messagebox.askyesno("Suggestion", message, parent=self)
+            self.bring_to_front() # After a message box is dismissed
+            if response:
+                # If user agrees, perform the search with the suggested value
+                self.value_var.set(suggested)
+                self.run_search(suggested_value=suggested)
+        
+        return;
+
+    def search_everywhere(self):
+        """Open a GlobalSearchWindow for the value, e.g. an ISBN or a tax id."""
+        value = self.value_var.get().strip()
+        if not value:
+            messagebox.showwarning("Warning", "Please type a value to search for.", parent=self)
+            self.bring_to_front() # After a message box is dismissed
+
+            return;
+
+        GlobalSearchWindow(self, self.master, self.db_manager, value)
+
+        return;
+
     def display_results(self, rows, table_name):
-        """Populate the results_tree with the query results."""
+        """Set up the results_tree columns for `table_name` and show `rows` (any iterable). Returns the row count."""
+        self.results_table = table_name # The table the shown rows belong to (see select_for_editing)
+
         # Clear old columns
         self.results_tree.delete(*self.results_tree.get_children())
         self.results_tree["columns"] = ()
         
-        # Get columns info
-        columns_info = self.db_manager.get_table_columns(table_name)
-        col_names = [col[1] for col in columns_info]
+        # Get columns info (cached by the DatabaseManager)
+        col_names = self.db_manager.get_table_meta(table_name)["col_names"]
         
         self.results_tree["columns"] = col_names
         for c in col_names:
@@ -211,8 +485,36 @@ class SearchWindow(tk.Toplevel):
             if c == "comments":
                 self.results_tree.column(c, width=120, anchor='w') # w: Align all data in your Treeview to the left! ⭐
         
-        for row in rows:
-            self.results_tree.insert("", "end", values=row)
+        return self.append_results(rows);
+
+    def append_results(self, rows):
+        """
+        Append (primary key, display-ready row) pairs to the results_tree; the item id
+        is the key (see key_to_iid). Returns how many were added.
+        """
+        n_rows = 0
+        for (key, row) in rows:
+            iid = key_to_iid(key)
+            if self.results_tree.exists(iid):
+                continue
+            self.results_tree.insert("", "end", iid=iid, values=row)
+            n_rows += 1
+
+        return n_rows;
+
+    def export_results(self):
+        """Export every row of the last search (not only the ones shown) to CSV / JSON Lines."""
+        if self.results_query is None:
+            messagebox.showwarning("No results", "Run a search first.", parent=self)
+            self.bring_to_front() # After a message box is dismissed
+
+            return;
+
+        (query, params) = self.results_query
+        export_with_progress(
+            self, self.query_executor, QueryExporter(self.db_manager, query, params),
+            "Export Search Results", initial_name=f"{self.results_table}_search"
+        )
 
         return;
 
@@ -225,16 +527,14 @@ class SearchWindow(tk.Toplevel):
 
             return;
 
-        # We assume only one row selected
-        row_data = self.results_tree.item(selected, 'values')
-        # Δεν χρειάζεται μετατροπή, είναι ήδη σε display value το main Window!
+        # We assume only one row selected; its item id is the primary key
+        key = iid_to_key(selected[0])
         
-        # Get the actual table name
-        table_friendly = self.table_var.get()
-        table = table_from_display(table_friendly)
+        # The table of the results (the combobox may have changed since the search)
+        table = self.results_table
         
         # Call a method on the parent (the main app) to select the row
-        self.master.select_row_in_table(table, row_data)
+        self.master.select_row_in_table(table, key)
         
         self.destroy()
 
@@ -7,17 +7,20 @@ matplotlib.use("TkAgg")
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.pyplot as plt
 
-from ourModules.translations import SPECIALIZATION_REVERSE_MAP
+from ourModules.exporter import QueryExporter, export_with_progress
 
 class StatsWindow(tk.Toplevel):
     """
     A separate Toplevel window for statistics & charts.
     """
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, query_executor):
         super().__init__(parent)
         
         self.title("Database Statistics")
         self.db_manager = db_manager
+        self.query_executor = query_executor # Aggregates run off the Tk thread
+        self.chart_task = None               # QueryTask of the chart being computed
+        self.chart_query = None              # (sql, title) of the last chart, for Export
         
         # Main container
         container = ttk.Frame(self, padding=10)
@@ -92,11 +95,12 @@ class StatsWindow(tk.Toplevel):
         btn_author_sales = ttk.Button(
             btn_frame, text="Author Sales",
             command=lambda:self.plot_chart(
-                f'''
+                '''
                 SELECT "PARTNER"."name", SUM("client_orders"."quantity") AS Total_Sales
-                FROM ("PARTNER" JOIN "contributes" ON "contributes"."Partner_TaxId" = "PARTNER"."Tax_Id")
+                FROM (("specialisation_labels" JOIN "PARTNER" ON "PARTNER"."specialisation" = "specialisation_labels"."id")
+                                 JOIN "contributes" ON "contributes"."Partner_TaxId" = "PARTNER"."Tax_Id")
                                  JOIN "client_orders" ON "client_orders"."Publication-isbn" = "contributes"."Publication-isbn"
-                WHERE "PARTNER"."specialisation" = {SPECIALIZATION_REVERSE_MAP["Writer"]}
+                WHERE "specialisation_labels"."label" = 'Writer'
                 GROUP BY "PARTNER"."Tax_Id"
                 ORDER BY Total_Sales DESC;
                 ''',
@@ -149,6 +153,9 @@ class StatsWindow(tk.Toplevel):
         )
         btn_combined_costs.pack(side="left", padx=5)
 
+        btn_export = ttk.Button(btn_frame, text="Export Data…", command=self.export_chart_data)
+        btn_export.pack(side="left", padx=(20, 5))
+
 
 
 
@@ -159,6 +166,15 @@ class StatsWindow(tk.Toplevel):
         
         self.canvas = None
 
+        self.bind("<Destroy>", self.on_destroy)
+
+        return;
+
+    def on_destroy(self, event):
+        """Cancel a running aggregate when the window closes."""
+        if event.widget is self and self.chart_task is not None:
+            self.chart_task.cancel()
+
         return;
 
 
@@ -166,14 +182,42 @@ class StatsWindow(tk.Toplevel):
     def plot_chart(self, sql_query, x_label_name, y_label_name, title_name, chart_color):
         """
         A universal chart plotting function.
+        The query runs in the background; the chart is drawn once its rows arrive.
         """
-        try:
-            rows = self.db_manager.fetchall(sql_query)
-        except Exception as e:
-            messagebox.showerror("Data error", f"Could not fetch data:\n\n{type(e).__name__}: {e}")
+        if self.chart_task is not None:
+            self.chart_task.cancel() # Only the last clicked chart is drawn
+        self.chart_query = (sql_query, title_name)
+
+        def on_error(e):
+            messagebox.showerror("Data error", f"Could not fetch data:\n\n{type(e).__name__}: {e}", parent=self)
 
             return;
-    
+
+        self.chart_task = self.query_executor.submit_query(
+            sql_query,
+            on_done=lambda rows: self.draw_chart(rows, x_label_name, y_label_name, title_name, chart_color),
+            on_error=on_error,
+            tag=f"Chart: {title_name}"
+        )
+
+        return;
+
+    def export_chart_data(self):
+        """Export the rows behind the last chart to CSV / JSON Lines."""
+        if self.chart_query is None:
+            messagebox.showwarning("No chart", "Show a chart first.", parent=self)
+            return;
+
+        (sql_query, title_name) = self.chart_query
+        export_with_progress(
+            self, self.query_executor, QueryExporter(self.db_manager, sql_query),
+            f"Export {title_name}", initial_name=title_name.replace(" ", "_")
+        )
+
+        return;
+
+    def draw_chart(self, rows, x_label_name, y_label_name, title_name, chart_color):
+        """Print the (x, y) rows as a table and embed them as a bar chart."""
         x_list = [r[0] if r[0] else "Unknown" for r in rows]
         y_list = [r[1] if r[1] else 0 for r in rows]
     
@@ -1,26 +1,61 @@
 # ourModules/table_tab.py
 
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import sqlite3
+import bisect
+from collections import deque
 #from main import *
-from ourModules.translations import to_display_value, from_display_value, get_specialization_display_values
+from ourModules.keyset_pager import KeysetPager, key_to_iid, iid_to_key
+from ourModules.csv_importer import CsvImporter
+from ourModules.progress_window import ProgressWindow
+from ourModules.exporter import QueryExporter, export_with_progress
+from ourModules.query_builder import prefix_predicate, is_numeric_type
+from ourModules.translations import compile_row_to_display, from_display_value, get_specialization_display_values
 
 class TableTab(ttk.Frame):
     """
     Each tab handles CRUD for a single table.
     """
-    def __init__(self, parent_notebook, db_manager, table_name, main_app, display_name=None):
+    PAGE_SIZE = 200 # Rows per keyset page
+    MAX_PAGES = 3   # Pages kept in the TreeView at once, whatever the size of the table
+    FILTER_OPERATORS = (">=", "<=", "!=", "=", ">", "<") # Longest first, see filter_predicates
+    MAX_REREAD_PARAMS = 999 # Key values re-read in one query after a bulk update (SQLite's lowest variable limit)
+
+    def __init__(self, parent_notebook, db_manager, query_executor, table_name, main_app, display_name=None):
         super().__init__(parent_notebook)
         
         self.db_manager = db_manager
+        self.query_executor = query_executor # Background SQL (see ourModules/query_executor.py)
+        self.page_task = None                # QueryTask of the page being fetched
+        self.count_task = None               # QueryTask of the row count
         self.table_name = table_name
         self.display_name = display_name or table_name.capitalize() # Use display_name if provided
         self.main_app = main_app  # Reference to MainApplication instance
 
-        # Retrieve columns info
-        self.columns_info = self.db_manager.get_table_columns(self.table_name)
-        self.col_names = [col[1] for col in self.columns_info]
+        # Retrieve columns info (cached by the DatabaseManager)
+        table_meta = self.db_manager.get_table_meta(self.table_name)
+        self.columns_info = table_meta["columns"]
+        self.col_names = table_meta["col_names"]
+        self.col_types = table_meta["types"]
+        self.row_to_display = compile_row_to_display(self.col_names) # raw row -> display values
+        self.pk_cols = self.db_manager.get_primary_key(self.table_name) # all columns if no PK
+
+        # Sorting (heading clicks) and the filter row, both run by SQLite (see make_pager)
+        self.sort_col = None
+        self.sort_desc = False
+        self.sort_nullable = True
+        self.filter_vars = {}
+
+        # Keyset pagination state (see populate_treeview)
+        self.pager = self.make_pager()
+        self.pages = deque()     # Loaded pages, top to bottom: {"keys": [...], "items": [...]}
+        self.window_offset = 0   # Position of the first loaded row in the whole table
+        self.has_before = False  # More rows above / below the loaded window?
+        self.has_after = False
+        self.total_rows = None
+        self.loaded_version = None # DatabaseManager.table_version() the TreeView was loaded at
+        self.pending_select = None # Key to select once its page is loaded (see select_row_data)
         
         # Layout: top for Treeview, bottom for controls
         self.create_treeview_section()
@@ -31,6 +66,8 @@ class TableTab(ttk.Frame):
     
     def create_treeview_section(self):
         """Create a Treeview to show all rows for the given table."""
+        self.create_filter_row()
+
         self.tree_frame = ttk.Frame(self)
         self.tree_frame.pack(side="top", fill="both", expand=True, padx=5, pady=5)
         
@@ -41,14 +78,15 @@ class TableTab(ttk.Frame):
             self.tree_frame,
             columns=self.col_names,
             show='headings',
-            yscrollcommand=self.tree_scroll.set
+            selectmode='extended', # Ctrl / Shift + click: several rows for the bulk actions
+            yscrollcommand=self.on_tree_scroll # Loads more pages near the edges
         )
         self.tree.pack(side="left", fill="both", expand=True)
         self.tree_scroll.config(command=self.tree.yview)
         
-        # Set up headings
+        # Set up headings (click = sort by that column)
         for col in self.col_names:
-            self.tree.heading(col, text=col)
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
             self.tree.column(col, width=120, anchor='center')
             if col == "comments":
                 self.tree.column(col, width=120, anchor='w') # w: Align all data in your Treeview to the left! ⭐
@@ -69,6 +107,49 @@ class TableTab(ttk.Frame):
         self.unselect_btn = ttk.Button(self.btn_frame, text="Unselect", command=self.unselect_row)
         self.unselect_btn.pack(side="left", padx=5)
 
+        # Bulk "set column = value" on every selected row
+        self.bulk_col_var = tk.StringVar(value=self.col_names[0])
+        self.bulk_value_var = tk.StringVar()
+        ttk.Label(self.btn_frame, text="Set").pack(side="left", padx=(20, 2))
+        ttk.Combobox(
+            self.btn_frame, textvariable=self.bulk_col_var, values=self.col_names, state='readonly', width=18
+        ).pack(side="left", padx=2)
+        ttk.Label(self.btn_frame, text="=").pack(side="left", padx=2)
+        tk.Entry(self.btn_frame, textvariable=self.bulk_value_var, width=18, bg="white").pack(side="left", padx=2)
+        self.bulk_set_btn = ttk.Button(self.btn_frame, text="Set for Selected", command=self.bulk_set_selected)
+        self.bulk_set_btn.pack(side="left", padx=5)
+
+        self.import_btn = ttk.Button(self.btn_frame, text="Import CSV…", command=self.import_csv)
+        self.import_btn.pack(side="left", padx=(20, 5))
+
+        self.export_btn = ttk.Button(self.btn_frame, text="Export…", command=self.export_view)
+        self.export_btn.pack(side="left", padx=5)
+
+        # "Rows x-y of n" of the loaded window
+        self.lbl_rows = ttk.Label(self.btn_frame, text="Rows 0 of …")
+        self.lbl_rows.pack(side="right", padx=5)
+
+        return;
+
+    def create_filter_row(self):
+        """One small Entry per column; the filters are applied with Enter or the Filter button."""
+        self.filter_frame = ttk.Frame(self)
+        self.filter_frame.pack(side="top", fill="x", padx=5, pady=(5, 0))
+
+        for index, col_name in enumerate(self.col_names):
+            ttk.Label(self.filter_frame, text=col_name).grid(row=0, column=index, padx=2, sticky='w')
+            var = tk.StringVar()
+            ent = tk.Entry(self.filter_frame, textvariable=var, width=14, bg="white")
+            ent.grid(row=1, column=index, padx=2, sticky='w')
+            ent.bind("<Return>", lambda event: self.apply_filters())
+            self.filter_vars[col_name] = var
+
+        filter_btn = ttk.Button(self.filter_frame, text="Filter", command=self.apply_filters)
+        filter_btn.grid(row=1, column=len(self.col_names), padx=5)
+
+        clear_btn = ttk.Button(self.filter_frame, text="Clear Filter", command=self.clear_filters)
+        clear_btn.grid(row=1, column=len(self.col_names) + 1, padx=5)
+
         return;
 
     def create_form_section(self):
@@ -127,21 +208,385 @@ class TableTab(ttk.Frame):
 
         return;
     
-    def populate_treeview(self):
+    def make_pager(self):
+        """KeysetPager of the current sort column / direction and filters."""
+        return KeysetPager(
+            self.table_name, self.col_names, self.pk_cols, page_size=self.PAGE_SIZE,
+            sort_col=self.sort_col, descending=self.sort_desc, filters=self.filter_predicates(),
+            sort_nullable=self.sort_nullable
+        );
+
+    def filter_predicates(self):
+        """
+        (sql, params) predicates of the filter row. A filter may start with an operator
+        (=, !=, <, <=, >, >=); without one, numeric columns match by equality and the
+        others, dates included, by prefix (see query_builder.prefix_predicate: an
+        index-friendly range on text columns, case-sensitive). Display values are
+        converted back to raw values first, e.g. "Writer" -> 2 for specialisation.
+        """
+        predicates = []
+        for col_name, var in self.filter_vars.items():
+            text = var.get().strip()
+            if not text:
+                continue
+
+            op = None
+            for candidate in self.FILTER_OPERATORS:
+                if text.startswith(candidate):
+                    op = candidate
+                    text = text[len(candidate):].strip()
+                    break
+            value = from_display_value(col_name, text)
+
+            if op is None:
+                col_type = self.col_types.get(col_name, "")
+                if isinstance(value, str) and not is_numeric_type(col_type):
+                    predicates.append(prefix_predicate(col_name, col_type, value))
+                    continue
+                op = "="
+            predicates.append((f'"{col_name}" {op} ?', (value,)))
+
+        return predicates;
+
+    def sort_by(self, col_name):
+        """Heading click: ascending, then descending, then back to primary key order."""
+        if self.sort_col != col_name:
+            (self.sort_col, self.sort_desc) = (col_name, False)
+        elif not self.sort_desc:
+            self.sort_desc = True
+        else:
+            (self.sort_col, self.sort_desc) = (None, False)
+
+        for col in self.col_names:
+            arrow = ""
+            if col == self.sort_col:
+                arrow = " ▼" if self.sort_desc else " ▲"
+            self.tree.heading(col, text=col + arrow)
+
+        if self.sort_col is None:
+            self.sort_nullable = True
+            self.pager = self.make_pager()
+            self.populate_treeview()
+
+            return;
+
+        sort_col = self.sort_col
+
+        def on_nulls_known(has_nulls):
+            if self.sort_col != sort_col:
+                return; # Another heading was clicked meanwhile
+            self.sort_nullable = has_nulls
+            self.pager = self.make_pager()
+            self.populate_treeview()
+
+            return;
+
+        self.column_has_nulls(sort_col, on_nulls_known)
+
+        return;
+
+    def column_has_nulls(self, col_name, on_done):
+        """
+        Whether a column may hold NULLs, handed to `on_done(bool)`: at once if it is declared
+        NOT NULL / primary key, else the EXISTS check runs in the background (without an index
+        on the column it is a full table scan).
+        """
+        info = next(col for col in self.columns_info if col[1] == col_name)
+        if info[3] or col_name in self.pk_cols: # PRAGMA table_info: notnull flag
+            on_done(False)
+
+            return;
+
+        self.query_executor.submit_query(
+            f'SELECT EXISTS (SELECT 1 FROM "{self.table_name}" WHERE "{col_name}" IS NULL)',
+            on_done=lambda rows: on_done(bool(rows[0][0])), on_error=self.on_load_error,
+            tag=f"Tab: {self.table_name}"
+        )
+
+        return;
+
+    def apply_filters(self):
+        self.pager = self.make_pager()
+        self.populate_treeview()
+
+        return;
+
+    def clear_filters(self):
+        for var in self.filter_vars.values():
+            var.set("")
+        self.apply_filters()
+
+        return;
+
+    def populate_treeview(self, keep_position=False, start_key=None):
+        """
+        (Re)load the TreeView. Only a window of at most MAX_PAGES keyset pages is
+        kept in the TreeView; more pages are fetched in the background while the
+        user scrolls (see on_tree_scroll). With `keep_position` the reload starts
+        from the first row currently shown instead of the top of the table,
+        with `start_key` from the row with that order key (see KeysetPager.row_key).
+        """
+        if start_key is None and keep_position and self.pages and self.pages[0]["keys"]:
+            start_key = self.pages[0]["keys"][0]
+        self.loaded_version = self.db_manager.table_version(self.table_name)
+
+        if self.page_task is not None:
+            self.page_task.cancel() # A newer reload makes the running one stale
+            self.page_task = None
+
         # Clear existing rows
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        rows = self.db_manager.fetchall(f'SELECT * FROM "{self.table_name}"')
-        for r in rows:
-            display_values = []
-            for col_idx, raw_val in enumerate(r):
-                col_name = self.col_names[col_idx]
-                # Transform the raw_val to a display-friendly value
-                display_val = to_display_value(col_name, raw_val)
-                display_values.append(display_val)
-            
-            self.tree.insert("", "end", values=display_values)
+        self.tree.delete(*self.tree.get_children())
+        self.pages = deque()
+        self.window_offset = 0
+        self.has_before = False
+        self.has_after = False
+
+        if start_key is None:
+            self.load_page("first")
+        else:
+            self.load_page("at", start_key)
+        self.refresh_row_count()
+
+        return;
+
+    def is_stale(self):
+        """True if the table changed (see DatabaseManager.mark_changed) since the TreeView was loaded."""
+        return self.loaded_version != self.db_manager.table_version(self.table_name);
+
+    def load_page(self, direction, key=None):
+        """
+        Fetch one keyset page in the background.
+        direction: "first", "at" (starting at `key`), "after" or "before" `key`.
+        """
+        if direction == "first":
+            (query, params) = self.pager.first_page()
+        elif direction == "at":
+            (query, params) = self.pager.page_at(key)
+        elif direction == "after":
+            (query, params) = self.pager.page_after(key)
+        else:
+            (query, params) = self.pager.page_before(key)
+
+        row_to_display = self.row_to_display
+        pager = self.pager
+
+        def job(conn, task):
+            rows = self.db_manager.fetchall(query, params, conn=conn)
+            if direction == "before":
+                rows.reverse() # Fetched in reverse view order
+            offset = None
+            if direction == "at":
+                # Position of the page inside the whole table (for the "Rows x-y of n" label)
+                (count_query, count_params) = pager.count_before(key)
+                offset = self.db_manager.fetchall(count_query, count_params, conn=conn)[0][0]
+            # Transform the raw values to display-friendly values (still off the Tk thread)
+            page = [(pager.row_key(r), pager.row_pk(r), row_to_display(r)) for r in rows]
+            return (page, offset);
+
+        self.page_task = self.query_executor.submit(
+            job,
+            tag=f"Tab: {self.table_name}",
+            on_done=lambda result: self.on_page_loaded(direction, *result),
+            on_error=self.on_load_error
+        )
+
+        return;
+
+    def on_load_error(self, e):
+        self.page_task = None
+        messagebox.showerror("Error", f"Could not load {self.display_name}.\n{e}")
+
+        return;
+
+    def on_page_loaded(self, direction, page, offset):
+        """Insert a fetched page into the TreeView and trim the window to MAX_PAGES pages."""
+        self.page_task = None
+        full_page = len(page) == self.pager.page_size
+
+        if direction in ("first", "at"):
+            self.window_offset = offset or 0
+            self.has_before = self.window_offset > 0
+            self.has_after = full_page
+            if page:
+                self.pages.append(self.insert_page(page, "end"))
+        elif direction == "after":
+            self.has_after = full_page
+            if page:
+                self.pages.append(self.insert_page(page, "end"))
+        else: # "before"
+            self.has_before = full_page
+            if page:
+                self.pages.appendleft(self.insert_page(page, 0))
+                self.window_offset -= len(page)
+                self.tree.yview_scroll(len(page), "units") # Keep the rows the user was looking at in place
+
+        # Drop the page furthest away from the scrolling direction
+        while len(self.pages) > self.MAX_PAGES:
+            if direction == "before":
+                dropped = self.pages.pop()
+                self.has_after = True
+                self.tree.delete(*dropped["items"])
+            else:
+                dropped = self.pages.popleft()
+                self.has_before = True
+                self.window_offset += len(dropped["items"])
+                self.tree.delete(*dropped["items"])
+                self.tree.yview_scroll(-len(dropped["items"]), "units")
+
+        self.update_rows_label()
+
+        if self.pending_select is not None and direction in ("first", "at"):
+            iid = key_to_iid(self.pending_select)
+            self.pending_select = None
+            if self.tree.exists(iid):
+                self.select_item(iid)
+
+        return;
+
+    def insert_page(self, page, index):
+        """
+        Insert (order key, primary key, display values) rows at `index` ("end" or 0).
+        Returns the page record. The item id of every row is its primary key (see key_to_iid).
+        """
+        keys = []
+        items = []
+        position = 0
+        for (key, pk, display_values) in page:
+            iid = key_to_iid(pk)
+            if self.tree.exists(iid):
+                continue # Already inserted in place (see apply_row_delta)
+            at = "end" if index == "end" else index + position
+            items.append(self.tree.insert("", at, iid=iid, values=display_values))
+            keys.append(key)
+            position += 1
+
+        return {"keys": keys, "items": items};
+
+    def on_tree_scroll(self, first, last):
+        """yscrollcommand of the TreeView: move the scrollbar, fetch the next/previous page near the edges."""
+        self.tree_scroll.set(first, last)
+        if self.page_task is not None or not self.pages:
+            return;
+
+        if float(last) >= 0.95 and self.has_after:
+            self.load_page("after", self.pages[-1]["keys"][-1])
+        elif float(first) <= 0.05 and self.has_before:
+            self.load_page("before", self.pages[0]["keys"][0])
+
+        return;
+
+    def fetch_row(self, key=None, rowid=None):
+        """Raw values of one row, by primary key or by rowid (None if there is no such row)."""
+        if rowid is not None:
+            (query, params) = (f'SELECT * FROM "{self.table_name}" WHERE rowid = ?', (rowid,))
+        else:
+            (query, params) = self.pager.row_by_key(key)
+        rows = self.db_manager.fetchall(query, params)
+
+        return rows[0] if rows else None;
+
+    def apply_row_delta(self, old_key=None, new_row=None):
+        """
+        Apply one successful write to the TreeView in place, instead of reloading it:
+        the item of `old_key` is removed (update / delete) and `new_row` (raw values,
+        insert / update) is inserted at its key position, if that lies inside the
+        loaded window. Returns False if the window has to be reloaded instead.
+        """
+        if new_row is not None and not self.pager.is_plain():
+            return False; # Sorted / filtered view: SQLite decides where (and whether) the row shows up
+
+        new_key = self.pager.row_key(new_row) if new_row is not None else None
+
+        if old_key is not None and old_key != new_key:
+            self.remove_item(key_to_iid(old_key))
+            if new_row is None and self.total_rows is not None:
+                self.total_rows -= 1
+
+        if new_row is not None:
+            iid = key_to_iid(new_key)
+            display_values = self.row_to_display(new_row)
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=display_values) # Same key: just new values
+            else:
+                try:
+                    self.place_item(new_key, iid, display_values)
+                except TypeError:
+                    return False; # Keys Python cannot order like SQLite does (mixed types)
+                if old_key is None and self.total_rows is not None:
+                    self.total_rows += 1
+
+        self.update_rows_label()
+
+        return True;
+
+    def remove_item(self, iid):
+        """Remove one item from the TreeView and from its page record."""
+        if not self.tree.exists(iid):
+            return;
+
+        for page in self.pages:
+            if iid in page["items"]:
+                position = page["items"].index(iid)
+                del page["items"][position]
+                del page["keys"][position]
+                if not page["items"]:
+                    self.pages.remove(page)
+                break
+        self.tree.delete(iid)
+
+        return;
+
+    def place_item(self, key, iid, display_values):
+        """Insert a row at its key position inside the loaded window (nothing if it falls outside)."""
+        if not self.pages:
+            if not (self.has_before or self.has_after): # Empty table
+                self.pages.append({"keys": [key], "items": [self.tree.insert("", "end", iid=iid, values=display_values)]})
+            return;
+
+        if self.has_before and key < self.pages[0]["keys"][0]:
+            self.window_offset += 1 # Above the window: only shifts the row numbers
+            return;
+        if self.has_after and key > self.pages[-1]["keys"][-1]:
+            return;
+
+        index = 0 # Position inside the TreeView = rows of the pages before + position in the page
+        for page in self.pages:
+            if page is self.pages[-1] or key < page["keys"][-1]:
+                position = bisect.bisect_left(page["keys"], key)
+                page["keys"].insert(position, key)
+                page["items"].insert(position, self.tree.insert("", index + position, iid=iid, values=display_values))
+                break
+            index += len(page["items"])
+
+        return;
+
+    def refresh_row_count(self):
+        """Count the rows of the table in the background."""
+        if self.count_task is not None:
+            self.count_task.cancel()
+
+        def on_done(rows):
+            self.count_task = None
+            self.total_rows = rows[0][0]
+            self.update_rows_label()
+
+            return;
+
+        (query, params) = self.pager.count_query()
+        self.count_task = self.query_executor.submit_query(
+            query, params, on_done=on_done, tag=f"Tab: {self.table_name}"
+        )
+
+        return;
+
+    def update_rows_label(self):
+        loaded = sum(len(page["items"]) for page in self.pages)
+        total = "…" if self.total_rows is None else self.total_rows
+        if loaded:
+            text = f"Rows {self.window_offset + 1}-{self.window_offset + loaded} of {total}"
+        else:
+            text = f"Rows 0 of {total}"
+        self.lbl_rows.config(text=text)
 
         return;
     
@@ -150,6 +595,9 @@ class TableTab(ttk.Frame):
         selected_item = self.tree.selection()
         if not selected_item:
             return;
+        if len(selected_item) > 1: # Several rows: only the bulk actions apply
+            self.clear_form()
+            return;
         
         row_data = self.tree.item(selected_item, 'values')
         for col_name, value in zip(self.col_names, row_data): # Fill in the form
@@ -175,9 +623,12 @@ class TableTab(ttk.Frame):
         query = f'INSERT INTO "{self.table_name}" ({columns}) VALUES ({placeholders})'
         
         try:
-            self.db_manager.execute(query, data)
+            with self.db_manager.tag(f"Tab: {self.table_name}"):
+                cursor = self.db_manager.execute(query, data)
+                new_row = self.fetch_row(rowid=cursor.lastrowid)
             messagebox.showinfo("Success", "Record inserted successfully.")
-            self.main_app.refresh_all_tabs() # Refresh all tabs to ensure consistency
+            in_place = new_row is not None and self.apply_row_delta(new_row=new_row)
+            self.main_app.on_table_written(self.table_name, "insert", in_place) # Refresh only the tabs the write can affect
             self.clear_form()
         except sqlite3.IntegrityError as e:
             messagebox.showerror("Error", f"Insertion failed. IntegrityError: {e}")
@@ -193,7 +644,7 @@ class TableTab(ttk.Frame):
             messagebox.showwarning("Warning", "No row selected.")
             return;
         
-        old_row_data = self.tree.item(selected_item, 'values')
+        old_key = iid_to_key(selected_item[0]) # The item id is the primary key
         new_data = []
         for col_name in self.col_names:
             val = self.entry_vars[col_name].get().strip()
@@ -204,19 +655,12 @@ class TableTab(ttk.Frame):
         
         set_clause = ", ".join([f'"{c}"=?' for c in self.col_names])
         
-        # Identify PK columns
-        pk_cols = [col[1] for col in self.columns_info if col[5] != 0]
-        if not pk_cols:
-            # If no PK, match on all columns of the old row
-            pk_cols = self.col_names
-        
         where_clause_parts = []
         where_params = []
         
-        for idx, col_name in enumerate(self.col_names):
-            if col_name in pk_cols:
-                where_clause_parts.append(f'"{col_name}"=?')
-                where_params.append(old_row_data[idx])
+        for (col_name, key_val) in zip(self.pk_cols, old_key):
+            where_clause_parts.append(f'"{col_name}"=?')
+            where_params.append(key_val)
         
         where_clause = " AND ".join(where_clause_parts)
         query = f'UPDATE "{self.table_name}" SET {set_clause} WHERE {where_clause}'
@@ -224,9 +668,13 @@ class TableTab(ttk.Frame):
         params = new_data + where_params
         
         try:
-            self.db_manager.execute(query, params)
+            with self.db_manager.tag(f"Tab: {self.table_name}"):
+                self.db_manager.execute(query, params)
+                new_key = tuple(new_data[self.col_names.index(col_name)] for col_name in self.pk_cols)
+                new_row = self.fetch_row(key=new_key)
             messagebox.showinfo("Success", "Record updated successfully.")
-            self.main_app.refresh_all_tabs()
+            in_place = new_row is not None and self.apply_row_delta(old_key=old_key, new_row=new_row)
+            self.main_app.on_table_written(self.table_name, "update", in_place)
             self.clear_form()
             # Switch button back to Insert
             self.action_btn.configure(text="Insert", command=self.insert_record)
@@ -236,7 +684,11 @@ class TableTab(ttk.Frame):
         return;
     
     def delete_selected(self):
-        """Delete the selected row from the DB."""
+        """
+        Delete the selected rows from the DB: one executemany in one transaction.
+        Rows that cannot be deleted (e.g. a foreign key RESTRICT) are reported,
+        the others are deleted anyway.
+        """
         #self.conn.execute("PRAGMA foreign_keys = ON")
 
         selected_item = self.tree.selection()
@@ -244,33 +696,180 @@ class TableTab(ttk.Frame):
             messagebox.showwarning("Warning", "No row selected to delete.")
             return;
         
-        confirm = messagebox.askyesno("Confirm", "Are you sure you want to delete?")
+        question = "Are you sure you want to delete?" if len(selected_item) == 1 \
+            else f"Are you sure you want to delete {len(selected_item)} records?"
+        confirm = messagebox.askyesno("Confirm", question)
         if not confirm:
             return;
         
-        row_data = self.tree.item(selected_item, 'values')
-        pk_cols = [col[1] for col in self.columns_info if col[5] != 0]
-        if not pk_cols:
-            pk_cols = self.col_names
-        
-        where_clause_parts = []
-        where_params = []
-        for idx, col_name in enumerate(self.col_names):
-            if col_name in pk_cols:
-                where_clause_parts.append(f'"{col_name}"=?')
-                where_params.append(row_data[idx])
+        keys = [iid_to_key(item) for item in selected_item] # The item id is the primary key
         
-        where_clause = " AND ".join(where_clause_parts)
+        where_clause = " AND ".join(f'"{col_name}"=?' for col_name in self.pk_cols)
         query = f'DELETE FROM "{self.table_name}" WHERE {where_clause}'
         
         try:
-            self.db_manager.execute(query, where_params)
-            self.tree.delete(selected_item)
-            messagebox.showinfo("Success", "Record deleted successfully.")
-            self.main_app.refresh_all_tabs()
-            self.clear_form()
+            with self.db_manager.tag(f"Tab: {self.table_name}"):
+                (_, failures) = self.db_manager.executemany_each(query, keys)
         except Exception as e:
             messagebox.showerror("Error", f"Could not delete record.\n{e}")
+            return;
+
+        failed = {tuple(params) for (_, params, _) in failures}
+        deleted = [key for key in keys if key not in failed]
+        in_place = all([self.apply_row_delta(old_key=key) for key in deleted])
+        if deleted:
+            self.main_app.on_table_written(self.table_name, "delete", in_place) # One refresh for the whole batch
+            self.clear_form()
+        self.report_bulk_result("deleted", len(deleted), failures)
+
+        return;
+
+    def bulk_set_selected(self):
+        """Set one column to the same value on every selected row (one executemany, one transaction)."""
+        selected_item = self.tree.selection()
+        if not selected_item:
+            messagebox.showwarning("Warning", "No row selected.")
+            return;
+
+        col_name = self.bulk_col_var.get()
+        value = from_display_value(col_name, self.bulk_value_var.get().strip())
+        if value == '':
+            value = None
+
+        confirm = messagebox.askyesno("Confirm", f'Set "{col_name}" = {value!r} on {len(selected_item)} records?')
+        if not confirm:
+            return;
+
+        keys = [iid_to_key(item) for item in selected_item]
+        where_clause = " AND ".join(f'"{c}"=?' for c in self.pk_cols)
+        query = f'UPDATE "{self.table_name}" SET "{col_name}"=? WHERE {where_clause}'
+
+        try:
+            with self.db_manager.tag(f"Tab: {self.table_name}"):
+                (_, failures) = self.db_manager.executemany_each(query, [(value, *key) for key in keys])
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not update records.\n{e}")
+            return;
+
+        failed = {tuple(params[1:]) for (_, params, _) in failures}
+        updated = [key for key in keys if key not in failed]
+        if updated:
+            self.reread_updated_rows(updated, col_name, value)
+        self.report_bulk_result("updated", len(updated), failures)
+
+        return;
+
+    def reread_updated_rows(self, keys, col_name, value):
+        """
+        After `col_name` = `value` was set on the rows of `keys`: re-read them in one
+        background query and apply them in place (their key changes too if the column
+        is part of the primary key). Sorted / filtered views and selections over
+        MAX_REREAD_PARAMS key values reload the window instead.
+        """
+        new_keys = [tuple(value if c == col_name else k for c, k in zip(self.pk_cols, key)) for key in keys]
+        if not self.pager.is_plain() or len(new_keys) * len(self.pk_cols) > self.MAX_REREAD_PARAMS:
+            self.main_app.on_table_written(self.table_name, "update")
+            return;
+
+        def on_done(rows):
+            rows_by_key = {self.pager.row_pk(row): row for row in rows}
+            in_place = all([
+                rows_by_key.get(new_key) is not None and self.apply_row_delta(old_key=key, new_row=rows_by_key[new_key])
+                for (key, new_key) in zip(keys, new_keys)
+            ])
+            self.main_app.on_table_written(self.table_name, "update", in_place)
+
+            return;
+
+        (query, params) = self.pager.rows_by_keys(new_keys)
+        self.query_executor.submit_query(
+            query, params, on_done=on_done,
+            on_error=lambda e: self.main_app.on_table_written(self.table_name, "update"), # Reload instead
+            tag=f"Tab: {self.table_name}"
+        )
+
+        return;
+
+    def import_csv(self):
+        """Stream a CSV file into this table in the background (see ourModules/csv_importer.py)."""
+        csv_path = filedialog.askopenfilename(
+            parent=self, title=f"Import into {self.display_name}",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not csv_path:
+            return;
+
+        importer = CsvImporter(self.db_manager, self.table_name)
+        task = None
+
+        def on_cancel():
+            task.cancel() # Chunks committed so far stay in the table
+            progress.finish()
+            self.main_app.on_table_written(self.table_name, "insert")
+
+            return;
+
+        progress = ProgressWindow(self, f"Import into {self.display_name}", on_cancel=on_cancel)
+
+        def job(conn, task):
+            return importer.run(
+                csv_path, conn=conn, cancel_event=task.cancel_event,
+                progress=lambda rows, fraction: task.report((rows, fraction))
+            );
+
+        def on_progress(value):
+            (rows, fraction) = value
+            progress.update_progress(f"{rows} rows read ({fraction:.0%})", fraction)
+
+            return;
+
+        def on_done(summary):
+            progress.finish()
+            self.main_app.on_table_written(self.table_name, "insert")
+            message = f"{summary['inserted']} record(s) imported into {self.display_name}."
+            if summary["rejected"]:
+                message += f"\n{summary['rejected']} rejected, see:\n{summary['rejects_path']}"
+            messagebox.showinfo("Import", message)
+
+            return;
+
+        def on_error(e):
+            progress.finish()
+            self.main_app.on_table_written(self.table_name, "insert") # Earlier chunks may be committed
+            messagebox.showerror("Error", f"Import failed.\n{e}")
+
+            return;
+
+        task = self.query_executor.submit(
+            job, on_done=on_done, on_error=on_error, on_progress=on_progress,
+            read_only=False, tag=f"Import: {self.table_name}"
+        )
+
+        return;
+
+    def export_view(self):
+        """Export the rows of the view (current filters and sort order) to CSV / JSON Lines."""
+        (query, params) = self.pager.view_query()
+        export_with_progress(
+            self, self.query_executor, QueryExporter(self.db_manager, query, params),
+            f"Export {self.display_name}", initial_name=self.table_name
+        )
+
+        return;
+
+    def report_bulk_result(self, action, n_done, failures, max_shown=10):
+        """Message box of a bulk action: how many rows were done and why the others failed."""
+        if not failures:
+            messagebox.showinfo("Success", f"{n_done} record(s) {action} successfully.")
+            return;
+
+        lines = [f"{params}: {error}" for (_, params, error) in failures[:max_shown]]
+        if len(failures) > max_shown:
+            lines.append(f"... and {len(failures) - max_shown} more")
+        messagebox.showwarning(
+            "Partly done",
+            f"{n_done} record(s) {action}, {len(failures)} failed:\n" + "\n".join(lines)
+        )
 
         return;
     
@@ -299,28 +898,34 @@ class TableTab(ttk.Frame):
         
         return;
 
-    def select_row_data(self, row_data):
+    def select_row_data(self, key):
         """
-        Fill the form with the given row_data and select the matching row in the TreeView.
+        Select the row with primary key `key` (tuple of raw values) and fill the form with it.
+        The item id is the key, so a loaded row is found directly; a row outside the
+        loaded window is brought in by reloading the window starting at that row.
         """
-        # 1. Fill in the form fields
-        for col_name, value in zip(self.col_names, row_data):
-            self.entry_vars[col_name].set("" if value is None else str(value))
+        iid = key_to_iid(key)
+        if self.tree.exists(iid):
+            self.select_item(iid)
+            return;
 
-        # 2. Find a row in the Treeview that matches `row_data` exactly
         self.tree.selection_remove(*self.tree.selection())  # Clear any previous selection
-        
-        for item in self.tree.get_children():
-            item_values = self.tree.item(item, "values")
-            
-            # Compare the item_values with the row_data tuple
-            # Note: They must match exactly!
-            if item_values == row_data:
-                self.tree.selection_set(item)
-                self.tree.focus(item)  # move focus to that item
-                break
+        self.clear_form()
+        if not self.pager.is_plain(): # The row may be filtered out: show the whole table again
+            (self.sort_col, self.sort_desc) = (None, False)
+            for col in self.col_names:
+                self.tree.heading(col, text=col)
+                self.filter_vars[col].set("")
+            self.pager = self.make_pager()
+        self.pending_select = tuple(key) # Selected by on_page_loaded
+        self.populate_treeview(start_key=tuple(key)) # Primary key = order key without a sort column
 
-        # 3. Switch the action button to "Update"
-        self.action_btn.configure(text="Update", command=self.update_record)
+        return;
+
+    def select_item(self, iid):
+        """Select and show one TreeView item; <<TreeviewSelect>> fills the form (on_row_select)."""
+        self.tree.selection_set(iid)
+        self.tree.focus(iid)  # move focus to that item
+        self.tree.see(iid)
 
         return;
\ No newline at end of file
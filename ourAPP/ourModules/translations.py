@@ -34,6 +34,14 @@ PARTNER_COMMENT_MAP = {
 
 PARTNER_COMMENT_REVERSE_MAP = {v: k for k, v in PARTNER_COMMENT_MAP.items()}
 
+# The same mappings as SQL lookup views ("id", "label"), so that queries can filter and
+# group by the labels while the tables keep (and index) the raw keys. The DatabaseManager
+# creates them as TEMP views on every connection, so they always match the dicts above.
+LOOKUP_VIEWS = {
+    "specialisation": ("specialisation_labels", SPECIALIZATION_MAP),
+    "comments": ("comment_labels", PARTNER_COMMENT_MAP)
+}
+
 # Functions for translating between raw and display values
 def to_display_value(col_name: str, raw_value):
     """
@@ -58,6 +66,86 @@ def from_display_value(col_name: str, display_value):
 
     return display_value;
 
+# Compiled converters: the column name is looked at once per column list, not once per cell.
+# A value without a mapping (or None) is kept as it is, exactly like to_display_value / from_display_value.
+_TO_DISPLAY_MAPS = {
+    "specialisation": SPECIALIZATION_MAP,
+    "comments": PARTNER_COMMENT_MAP
+}
+
+_FROM_DISPLAY_MAPS = {
+    "specialisation": SPECIALIZATION_REVERSE_MAP,
+    "comments": PARTNER_COMMENT_REVERSE_MAP
+}
+
+def _identity(value):
+    return value;
+
+def _mapper(mapping):
+    """Converter of one mapped column: mapping.get(value, value)."""
+    get = mapping.get
+    return lambda value: get(value, value);
+
+def compile_display_converters(col_names) -> tuple:
+    """
+    One converter per column (identity for the columns with no display mapping):
+    converters[i](raw_value) == to_display_value(col_names[i], raw_value).
+    """
+    return tuple(
+        _mapper(_TO_DISPLAY_MAPS[col_name]) if col_name in _TO_DISPLAY_MAPS else _identity
+        for col_name in col_names
+    );
+
+def compile_from_display_converters(col_names) -> tuple:
+    """Same as compile_display_converters, for from_display_value."""
+    return tuple(
+        _mapper(_FROM_DISPLAY_MAPS[col_name]) if col_name in _FROM_DISPLAY_MAPS else _identity
+        for col_name in col_names
+    );
+
+def _row_transform(converters):
+    mapped = tuple((i, convert) for i, convert in enumerate(converters) if convert is not _identity)
+    if not mapped:
+        return list; # Nothing to translate in this table: just copy the row
+
+    def transform(row):
+        values = list(row)
+        for i, convert in mapped:
+            values[i] = convert(values[i])
+        return values;
+
+    return transform;
+
+def compile_row_to_display(col_names):
+    """
+    Single function turning a raw row (a sequence in `col_names` order) into a list of
+    display values. Only the mapped columns are touched; for a table without any
+    (most of them) it is simply `list`.
+    """
+    return _row_transform(compile_display_converters(col_names));
+
+def compile_row_from_display(col_names):
+    """Inverse of compile_row_to_display (display row -> list of raw values)."""
+    return _row_transform(compile_from_display_converters(col_names));
+
+def get_lookup_view(col_name: str):
+    """Name of the lookup view ("id", "label") of a column, None if the column has no display mapping."""
+    if col_name in LOOKUP_VIEWS:
+        return LOOKUP_VIEWS[col_name][0];
+
+    return None;
+
+def lookup_view_statements() -> list:
+    """CREATE TEMP VIEW statements of the LOOKUP_VIEWS (views cannot take parameters: literals are quoted here)."""
+    statements = []
+    for (view, mapping) in LOOKUP_VIEWS.values():
+        values = ", ".join(
+            "({}, '{}')".format(int(key), str(label).replace("'", "''")) for key, label in mapping.items()
+        )
+        statements.append(f'CREATE TEMP VIEW IF NOT EXISTS "{view}" ("id", "label") AS VALUES {values}')
+
+    return statements;
+
 def get_specialization_display_values():
     """
     Return a list of display-friendly specialization values.
@@ -89,6 +177,11 @@ def main():
     for key, value in SPECIALIZATION_MAP.items():
         print(f"{key} -> {value}")
 
+    print(" ")
+
+    to_display = compile_row_to_display(["Tax_Id", "name", "specialisation", "comments"])
+    print(to_display((123456789, "Maria", 2, 5)))
+
     return;
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+# tests/test_change_tracking.py
+# Run from ourAPP/: python -m unittest discover tests
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from ourModules.database_manager import DatabaseManager
+
+class ExternalChangesTest(unittest.TestCase):
+    """DatabaseManager.mark_changed / poll_external_changes against a second connection (another process)."""
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "test.db")
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('CREATE TABLE "BOOK" ("ISBN" integer PRIMARY KEY, "title" text)')
+            conn.execute('CREATE TABLE "PARTNER" ("id" integer PRIMARY KEY, "name" text)')
+        self.db = DatabaseManager(self.db_path)
+        self.db.poll_external_changes() # Baseline, as the application does at start-up
+        self.other = sqlite3.connect(self.db_path, isolation_level=None)
+
+        return;
+
+    def tearDown(self):
+        self.other.close()
+        self.db.close_connection()
+        self.tmp_dir.cleanup()
+
+        return;
+
+    def test_external_commit_is_reported(self):
+        self.other.execute('INSERT INTO "PARTNER" ("name") VALUES (\'Nikos\')')
+        self.assertTrue(self.db.poll_external_changes())
+        self.assertFalse(self.db.poll_external_changes())
+
+        return;
+
+    def test_own_write_is_not_external(self):
+        self.db.execute('INSERT INTO "BOOK" ("title") VALUES (\'A\')')
+        self.db.mark_changed(["BOOK"])
+        self.assertEqual(self.db.table_version("BOOK"), 1)
+        self.assertEqual(self.db.table_version("PARTNER"), 0)
+        self.assertFalse(self.db.poll_external_changes())
+
+        return;
+
+    def test_external_commit_before_own_write_is_not_absorbed(self):
+        # Another process commits between two polls, then the user saves a row of another table
+        self.other.execute('INSERT INTO "PARTNER" ("name") VALUES (\'Nikos\')')
+        self.db.execute('INSERT INTO "BOOK" ("title") VALUES (\'A\')')
+        self.db.mark_changed(["BOOK"])
+
+        self.assertEqual(self.db.table_version("PARTNER"), 1) # Not only the written table
+        self.assertFalse(self.db.poll_external_changes())     # Already accounted for
+
+        return;
+
+if __name__ == "__main__":
+    unittest.main()
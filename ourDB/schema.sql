@@ -196,3 +196,84 @@ CREATE TABLE IF NOT EXISTS "communication-PRINTING" (
 			-- όλες οι σχετικές εγγραφές στον πίνακα communication-PRINTING διαγράφονται αυτόματα.
 );  --το τυπογραφείο μπορεί να διαγραφεί μόνο αν δεν εχει καμια σχεση με καποια παραγγελια
 
+
+-- Indexes for sorting / filtering in the table tabs and for the foreign key checks and cascades
+-- (without them e.g. ON UPDATE CASCADE of GENRE scans the whole PUBLICATION table)
+CREATE INDEX IF NOT EXISTS "idx_client_orders_order_date" ON "client_orders" ("order date");
+CREATE INDEX IF NOT EXISTS "idx_client_orders_client" ON "client_orders" ("Client_Tax_ID");
+CREATE INDEX IF NOT EXISTS "idx_client_orders_isbn" ON "client_orders" ("Publication-isbn");
+CREATE INDEX IF NOT EXISTS "idx_publication_genre" ON "PUBLICATION" ("genre-id");
+-- Searches / charts by specialisation label go through the lookup view (translations.LOOKUP_VIEWS)
+-- down to the raw key, e.g. "Writer" -> "specialisation" IN (2)
+CREATE INDEX IF NOT EXISTS "idx_partner_specialisation" ON "PARTNER" ("specialisation");
+
+-- Full-text indexes of the text columns (SearchWindow: LIKE / STARTS WITH go through them instead of a table scan).
+-- "<table>_fts" is an external content FTS5 table (the text is not stored twice) with the trigram tokenizer
+-- (SQLite >= 3.34), so a MATCH phrase is a case-insensitive substring match, like LIKE '%value%'.
+-- The triggers keep them in sync; for an existing database run: python -m ourModules.fulltext DB (from ourAPP/)
+CREATE VIRTUAL TABLE IF NOT EXISTS "PARTNER_fts" USING fts5("name", content='PARTNER', content_rowid='rowid', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS "PARTNER_fts_insert" AFTER INSERT ON "PARTNER" BEGIN
+	INSERT INTO "PARTNER_fts" (rowid, "name") VALUES (new.rowid, new."name");
+END;
+CREATE TRIGGER IF NOT EXISTS "PARTNER_fts_delete" AFTER DELETE ON "PARTNER" BEGIN
+	INSERT INTO "PARTNER_fts" ("PARTNER_fts", rowid, "name") VALUES ('delete', old.rowid, old."name");
+END;
+CREATE TRIGGER IF NOT EXISTS "PARTNER_fts_update" AFTER UPDATE ON "PARTNER" WHEN old."name" IS NOT new."name" OR old.rowid IS NOT new.rowid BEGIN
+	INSERT INTO "PARTNER_fts" ("PARTNER_fts", rowid, "name") VALUES ('delete', old.rowid, old."name");
+	INSERT INTO "PARTNER_fts" (rowid, "name") VALUES (new.rowid, new."name");
+END;
+CREATE VIRTUAL TABLE IF NOT EXISTS "CONTRACT_fts" USING fts5("description", content='CONTRACT', content_rowid='rowid', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS "CONTRACT_fts_insert" AFTER INSERT ON "CONTRACT" BEGIN
+	INSERT INTO "CONTRACT_fts" (rowid, "description") VALUES (new.rowid, new."description");
+END;
+CREATE TRIGGER IF NOT EXISTS "CONTRACT_fts_delete" AFTER DELETE ON "CONTRACT" BEGIN
+	INSERT INTO "CONTRACT_fts" ("CONTRACT_fts", rowid, "description") VALUES ('delete', old.rowid, old."description");
+END;
+CREATE TRIGGER IF NOT EXISTS "CONTRACT_fts_update" AFTER UPDATE ON "CONTRACT" WHEN old."description" IS NOT new."description" OR old.rowid IS NOT new.rowid BEGIN
+	INSERT INTO "CONTRACT_fts" ("CONTRACT_fts", rowid, "description") VALUES ('delete', old.rowid, old."description");
+	INSERT INTO "CONTRACT_fts" (rowid, "description") VALUES (new.rowid, new."description");
+END;
+CREATE VIRTUAL TABLE IF NOT EXISTS "CLIENT_fts" USING fts5("name", "location", content='CLIENT', content_rowid='rowid', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS "CLIENT_fts_insert" AFTER INSERT ON "CLIENT" BEGIN
+	INSERT INTO "CLIENT_fts" (rowid, "name", "location") VALUES (new.rowid, new."name", new."location");
+END;
+CREATE TRIGGER IF NOT EXISTS "CLIENT_fts_delete" AFTER DELETE ON "CLIENT" BEGIN
+	INSERT INTO "CLIENT_fts" ("CLIENT_fts", rowid, "name", "location") VALUES ('delete', old.rowid, old."name", old."location");
+END;
+CREATE TRIGGER IF NOT EXISTS "CLIENT_fts_update" AFTER UPDATE ON "CLIENT" WHEN old."name" IS NOT new."name" OR old."location" IS NOT new."location" OR old.rowid IS NOT new.rowid BEGIN
+	INSERT INTO "CLIENT_fts" ("CLIENT_fts", rowid, "name", "location") VALUES ('delete', old.rowid, old."name", old."location");
+	INSERT INTO "CLIENT_fts" (rowid, "name", "location") VALUES (new.rowid, new."name", new."location");
+END;
+CREATE VIRTUAL TABLE IF NOT EXISTS "PRINTING_HOUSE_fts" USING fts5("p_location", content='PRINTING_HOUSE', content_rowid='rowid', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS "PRINTING_HOUSE_fts_insert" AFTER INSERT ON "PRINTING_HOUSE" BEGIN
+	INSERT INTO "PRINTING_HOUSE_fts" (rowid, "p_location") VALUES (new.rowid, new."p_location");
+END;
+CREATE TRIGGER IF NOT EXISTS "PRINTING_HOUSE_fts_delete" AFTER DELETE ON "PRINTING_HOUSE" BEGIN
+	INSERT INTO "PRINTING_HOUSE_fts" ("PRINTING_HOUSE_fts", rowid, "p_location") VALUES ('delete', old.rowid, old."p_location");
+END;
+CREATE TRIGGER IF NOT EXISTS "PRINTING_HOUSE_fts_update" AFTER UPDATE ON "PRINTING_HOUSE" WHEN old."p_location" IS NOT new."p_location" OR old.rowid IS NOT new.rowid BEGIN
+	INSERT INTO "PRINTING_HOUSE_fts" ("PRINTING_HOUSE_fts", rowid, "p_location") VALUES ('delete', old.rowid, old."p_location");
+	INSERT INTO "PRINTING_HOUSE_fts" (rowid, "p_location") VALUES (new.rowid, new."p_location");
+END;
+CREATE VIRTUAL TABLE IF NOT EXISTS "GENRE_fts" USING fts5("description", content='GENRE', content_rowid='rowid', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS "GENRE_fts_insert" AFTER INSERT ON "GENRE" BEGIN
+	INSERT INTO "GENRE_fts" (rowid, "description") VALUES (new.rowid, new."description");
+END;
+CREATE TRIGGER IF NOT EXISTS "GENRE_fts_delete" AFTER DELETE ON "GENRE" BEGIN
+	INSERT INTO "GENRE_fts" ("GENRE_fts", rowid, "description") VALUES ('delete', old.rowid, old."description");
+END;
+CREATE TRIGGER IF NOT EXISTS "GENRE_fts_update" AFTER UPDATE ON "GENRE" WHEN old."description" IS NOT new."description" OR old.rowid IS NOT new.rowid BEGIN
+	INSERT INTO "GENRE_fts" ("GENRE_fts", rowid, "description") VALUES ('delete', old.rowid, old."description");
+	INSERT INTO "GENRE_fts" (rowid, "description") VALUES (new.rowid, new."description");
+END;
+CREATE VIRTUAL TABLE IF NOT EXISTS "PUBLICATION_fts" USING fts5("title", content='PUBLICATION', content_rowid='rowid', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS "PUBLICATION_fts_insert" AFTER INSERT ON "PUBLICATION" BEGIN
+	INSERT INTO "PUBLICATION_fts" (rowid, "title") VALUES (new.rowid, new."title");
+END;
+CREATE TRIGGER IF NOT EXISTS "PUBLICATION_fts_delete" AFTER DELETE ON "PUBLICATION" BEGIN
+	INSERT INTO "PUBLICATION_fts" ("PUBLICATION_fts", rowid, "title") VALUES ('delete', old.rowid, old."title");
+END;
+CREATE TRIGGER IF NOT EXISTS "PUBLICATION_fts_update" AFTER UPDATE ON "PUBLICATION" WHEN old."title" IS NOT new."title" OR old.rowid IS NOT new.rowid BEGIN
+	INSERT INTO "PUBLICATION_fts" ("PUBLICATION_fts", rowid, "title") VALUES ('delete', old.rowid, old."title");
+	INSERT INTO "PUBLICATION_fts" (rowid, "title") VALUES (new.rowid, new."title");
+END;